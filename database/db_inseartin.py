@@ -189,47 +189,48 @@ def extract_diamond_weight(text):
 
 
 
+def build_db_row(unique_id, current_date, page_title, product_name, image_path, price, additional_info):
+    """Build a database row tuple in IBM_Algo_Webstudy_Products column order"""
+    return (
+        unique_id,
+        current_date,
+        (page_title or '')[:500],
+        (product_name or '')[:500],
+        (image_path or '')[:1000],
+        extract_karat_info(product_name or ''),
+        price,
+        extract_diamond_weight(product_name or ''),
+        additional_info[:1000] if additional_info else None
+    )
+
 def process_row(row):
     """Process individual row data for database insertion"""
     try:
-        unique_id = row.get('unique_id', str(uuid.uuid4()))
-        current_date = row.get('current_date', datetime.now().date())
-        header = row.get('page_title', '')[:500]
-        product_name = row.get('product_name', '')[:500]
-        image_path = row.get('image_path', '')[:1000]
-        
-        # Enhanced Kt extraction
-        kt = extract_karat_info(row.get('product_name', ''))
-        
-        # Price extraction
-        price = row.get('price', '')
-        
-        # Enhanced diamond weight extraction
-        total_dia_wt = extract_diamond_weight(row.get('product_name', ''))
-        
-        additional_info = row.get('additional_info', '')[:1000] if row.get('additional_info') else None
-        
-        return (
-            unique_id,
-            current_date,
-            header,
-            product_name,
-            image_path,
-            kt,
-            price,
-            total_dia_wt,
-            additional_info
+        return build_db_row(
+            row.get('unique_id', str(uuid.uuid4())),
+            row.get('current_date', datetime.now().date()),
+            row.get('page_title', ''),
+            row.get('product_name', ''),
+            row.get('image_path', ''),
+            row.get('price', ''),
+            row.get('additional_info')
         )
     except Exception as e:
         logger.error(f"Error processing row: {e}")
         return None
 
-def insert_into_db(data):
-    """Insert scraped data into the MSSQL database"""
+def insert_into_db(data, update_count=False):
+    """
+    Insert scraped data into the MSSQL database.
+    Rows may be dicts (processed via process_row) or tuples already built with build_db_row.
+    With update_count=True the monthly product count is updated in the same transaction.
+    Returns the number of inserted records.
+    """
     if not data:
         logger.warning("No data to insert into the database.")
-        return
-    
+        return 0
+
+    conn = None
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
@@ -239,16 +240,24 @@ def insert_into_db(data):
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
             
-            processed_data = [process_row(row) for row in data]
+            processed_data = [row if isinstance(row, tuple) else process_row(row) for row in data]
             # Filter out None values
             processed_data = [row for row in processed_data if row is not None]
             
-            if processed_data:
-                cursor.executemany(query, processed_data)
-                conn.commit()
-                logger.info(f"Inserted {len(processed_data)} records successfully.")
-            else:
+            if not processed_data:
                 logger.warning("No valid data to insert after processing.")
+                return 0
+
+            cursor.executemany(query, processed_data)
+            if update_count:
+                cursor.execute("""
+                    UPDATE IBM_Algo_Webstudy_scraping_settings 
+                    SET products_fetched_month = products_fetched_month + %s
+                    WHERE setting_name = 'monthly_product_limit'
+                """, (len(processed_data),))
+            conn.commit()
+            logger.info(f"Inserted {len(processed_data)} records successfully.")
+            return len(processed_data)
         
     except pymssql.DatabaseError as e:
         logger.error(f"Database error: {e}")
@@ -261,6 +270,7 @@ def insert_into_db(data):
     finally:
         if conn:
             conn.close()
+    return 0
 
 def update_product_count(count):
     """Update monthly product count in the database"""
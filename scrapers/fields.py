@@ -1,5 +1,4 @@
 import asyncio
-import base64
 import os
 import uuid
 import logging
@@ -9,8 +8,13 @@ import re
 from typing import Dict, Any, List
 import httpx
 from urllib.parse import urlparse
-from openpyxl import Workbook
-from database.db_inseartin import insert_into_db, update_product_count
+try:
+    import pybase64 as base64  # SIMD-accelerated, API-compatible with stdlib base64
+except ImportError:
+    import base64
+from scrapers.xlsx_writer import XlsxSheetWriter
+from scrapers.scrape_utils import link_downloaded_image
+from database.db_inseartin import insert_into_db, build_db_row
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +23,21 @@ logger = logging.getLogger(__name__)
 IMAGE_SAVE_PATH = os.getenv("IMAGE_SAVE_PATH")
 EXCEL_DATA_PATH = os.getenv("EXCEL_DATA_PATH")
 
+# Gold type alternatives in priority order; the matched group index doubles as the rank
+_GOLD_TYPE_RE = re.compile(
+    r"(?P<karat>\b(?:\d{1,2}ct|14k|18k|24k)\s+(?:yellow|white|rose)\s+gold\b)"
+    r"|(?P<color>\b(?:yellow|white|rose)\s+gold\b)"
+    r"|(?P<silver>\bsterling\s+silver\b)"
+    r"|(?P<platinum>\bplatinum\b)",
+    re.IGNORECASE
+)
+
+# Leading bytes of JPEG, PNG, GIF and WebP (RIFF) files, for responses mislabelled by the CDN
+_IMAGE_MAGIC = {b'\xff\xd8\xff', b'\x89PN', b'GIF', b'RIF'}
+
+# Diamond weight formats like "1.00ct", "1ct", "0.40 carat"
+_DIAMOND_WEIGHT_RE = re.compile(r"(?P<weight>\d+(?:\.\d+)?)\s*(?P<unit>ct|carat)", re.IGNORECASE)
+
 
 class FieldsScraper:
     """Parser for Fields.ie product pages with database and Excel functionality"""
@@ -39,8 +58,7 @@ class FieldsScraper:
         Returns: JSON response compatible with your requirements
         """
         try:
-            print("=================== Starting Fields Scraper ==================")
-            print(f"Processing {len(products_data)} product entries")
+            logger.info(f"Starting Fields Scraper: processing {len(products_data)} product entries")
             
             # Extract HTML content
             html_content = products_data[0].get('html', '') if products_data else ''
@@ -66,109 +84,117 @@ class FieldsScraper:
             # Process products
             database_records = []
             successful_downloads = 0
+            downloaded_images = {}  # image URL -> first downloaded path
             
-            # Create Excel workbook
-            wb = Workbook()
-            sheet = wb.active
-            sheet.title = "Fields Products"
-            
-            # Add headers
-            headers = [
-                'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
-                'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
-                'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
-                'Session ID', 'Page URL'
-            ]
-            sheet.append(headers)
-            
-            # Process each product
-            for i, product_html in enumerate(individual_products):
-                try:
-                    # Parse product data
-                    parsed_data = self.parse_product(product_html)
-                    
-                    # Skip if essential data is missing
-                    if (parsed_data.get('product_name') == "N/A" or 
-                        parsed_data.get('image_url') == "N/A"):
-                        print(f"Skipping product due to missing data: Name: {parsed_data.get('product_name')}, Image: {parsed_data.get('image_url')}")
+            # Create Excel workbook (rows are streamed straight into the xlsx package; saved when the block exits)
+            with XlsxSheetWriter(excel_path, "Fields Products") as sheet:
+                
+                # Add headers
+                headers = [
+                    'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
+                    'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
+                    'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
+                    'Session ID', 'Page URL'
+                ]
+                sheet.append(headers)
+                
+                # Per-scrape constants for the Excel rows
+                date_str = current_date.strftime('%Y-%m-%d')
+                time_str = current_time.strftime('%H:%M:%S')
+                
+                # Process each product
+                for i, product_html in enumerate(individual_products):
+                    try:
+                        # Parse product data
+                        parsed_data = self.parse_product(product_html)
+                        
+                        # Skip if essential data is missing
+                        if (parsed_data.get('product_name') == "N/A" or 
+                            parsed_data.get('image_url') == "N/A"):
+                            print(f"Skipping product due to missing data: Name: {parsed_data.get('product_name')}, Image: {parsed_data.get('image_url')}")
+                            continue
+                        
+                        # Generate unique ID
+                        unique_id = str(uuid.uuid4())
+                        product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
+                        
+                        # Download image - use async method, reusing images already fetched this session
+                        image_url = parsed_data.get('image_url')
+                        if image_url in downloaded_images:
+                            image_path = link_downloaded_image(
+                                downloaded_images[image_url], image_folder, unique_id, timestamp
+                            )
+                        else:
+                            image_path = asyncio.run(self.download_image_async(
+                                image_url, product_name, timestamp, image_folder, unique_id
+                            ))
+                            if image_path != "N/A":
+                                downloaded_images[image_url] = image_path
+                        
+                        if image_path != "N/A":
+                            successful_downloads += 1
+                        
+                        # Prepare additional info
+                        badges = parsed_data.get('badges', [])
+                        promotions = parsed_data.get('promotions', '')
+                        additional_info_parts = []
+                        
+                        if badges and badges != ["N/A"]:
+                            additional_info_parts.extend(badges)
+                        if promotions and promotions != "N/A":
+                            additional_info_parts.append(promotions)
+                        
+                        additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
+                        
+                        # Create database record (tuple in table column order)
+                        database_records.append(build_db_row(
+                            unique_id,
+                            current_date,
+                            page_title,
+                            product_name,
+                            image_path,
+                            parsed_data.get('price'),
+                            additional_info
+                        ))
+                        
+                        # Add to Excel
+                        sheet.append([
+                            unique_id,
+                            date_str,
+                            page_title,
+                            product_name,
+                            image_path,
+                            parsed_data.get('gold_type', 'N/A'),
+                            parsed_data.get('price', 'N/A'),
+                            parsed_data.get('diamond_weight', 'N/A'),
+                            additional_info,
+                            time_str,
+                            image_url,
+                            parsed_data.get('link', 'N/A'),
+                            session_id,
+                            page_url
+                        ])
+                        
+                        # Log progress every 64 products to keep stdout off the hot path
+                        if i % 64 == 0:
+                            logger.info("Processed product %d: %s", i + 1, product_name)
+                        
+                    except Exception as e:
+                        print(f"Error processing product {i}: {e}")
                         continue
-                    
-                    # Generate unique ID
-                    unique_id = str(uuid.uuid4())
-                    product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
-                    
-                    # Download image - use async method
-                    image_url = parsed_data.get('image_url')
-                    image_path = asyncio.run(self.download_image_async(
-                        image_url, product_name, timestamp, image_folder, unique_id
-                    ))
-                    
-                    if image_path != "N/A":
-                        successful_downloads += 1
-                    
-                    # Prepare additional info
-                    badges = parsed_data.get('badges', [])
-                    promotions = parsed_data.get('promotions', '')
-                    additional_info_parts = []
-                    
-                    if badges and badges != ["N/A"]:
-                        additional_info_parts.extend(badges)
-                    if promotions and promotions != "N/A":
-                        additional_info_parts.append(promotions)
-                    
-                    additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
-                    
-                    # Create database record
-                    db_record = {
-                        'unique_id': unique_id,
-                        'current_date': current_date,
-                        'page_title': page_title,
-                        'product_name': product_name,
-                        'image_path': image_path,
-                        'price': parsed_data.get('price'),
-                        'diamond_weight': parsed_data.get('diamond_weight'),
-                        'gold_type': parsed_data.get('gold_type'),
-                        'additional_info': additional_info,
-                    }
-                    
-                    database_records.append(db_record)
-                    
-                    # Add to Excel
-                    sheet.append([
-                        unique_id,
-                        current_date.strftime('%Y-%m-%d'),
-                        page_title,
-                        product_name,
-                        image_path,
-                        parsed_data.get('gold_type', 'N/A'),
-                        parsed_data.get('price', 'N/A'),
-                        parsed_data.get('diamond_weight', 'N/A'),
-                        additional_info,
-                        current_time.strftime('%H:%M:%S'),
-                        image_url,
-                        parsed_data.get('link', 'N/A'),
-                        session_id,
-                        page_url
-                    ])
-                    
-                    print(f"Processed product {i+1}: {product_name}")
-                    
-                except Exception as e:
-                    print(f"Error processing product {i}: {e}")
-                    continue
             
-            # Save Excel file
-            wb.save(excel_path)
             print(f"Excel file saved: {excel_path}")
             
-            # Insert data into the database and update product count
+            # Insert data and update product count in a single transaction;
+            # insert_into_db logs and swallows database errors, so check its count
             if database_records:
-                insert_into_db(database_records)
-                update_product_count(len(database_records))
+                inserted = insert_into_db(database_records, update_count=True)
+                if inserted != len(database_records):
+                    raise RuntimeError(f"Database insert stored {inserted} of {len(database_records)} records")
             
             # Encode Excel file to base64
             with open(excel_path, "rb") as file:
-                base64_file = base64.b64encode(file.read()).decode("utf-8")
+                base64_file = base64.b64encode(file.read()).decode("ascii")
             
             # Return JSON response
             return {
@@ -213,6 +239,8 @@ class FieldsScraper:
                     'promotions': "N/A"
                 }
             
+            badges, promotions = self._extract_badges_and_promotions(soup)
+            
             return {
                 'product_name': product_name,
                 'price': price,
@@ -220,8 +248,8 @@ class FieldsScraper:
                 'link': link,
                 'diamond_weight': self._extract_diamond_weight(product_name),
                 'gold_type': self._extract_gold_type(product_name),
-                'badges': self._extract_badges(soup),
-                'promotions': self._extract_promotions(soup)
+                'badges': badges,
+                'promotions': promotions
             }
         except Exception as e:
             logger.error(f"Error parsing product: {e}")
@@ -345,68 +373,51 @@ class FieldsScraper:
         if not product_name or product_name == "N/A":
             return "N/A"
         
-        # Fields uses different diamond weight formats like "1.00ct", "0.40ct", etc.
-        diamond_patterns = [
-            r"(\d+\.\d+)\s*ct",  # 1.00ct, 0.40ct
-            r"(\d+)\s*ct",       # 1ct
-            r"(\d+\.\d+)\s*carat",  # 1.00 carat
-            r"(\d+)\s*carat"     # 1 carat
-        ]
-        
-        for pattern in diamond_patterns:
-            diamond_match = re.search(pattern, product_name, re.IGNORECASE)
-            if diamond_match:
-                weight = diamond_match.group(1)
-                return f"{weight} CT"
+        # Single scan; prefer decimal "ct" over whole "ct", then decimal/whole "carat"
+        best_match = None
+        best_rank = 4
+        for diamond_match in _DIAMOND_WEIGHT_RE.finditer(product_name):
+            rank = (2 if diamond_match.group('unit').lower() == 'carat' else 0) + ('.' not in diamond_match.group('weight'))
+            if rank < best_rank:
+                best_match, best_rank = diamond_match, rank
+                if rank == 0:
+                    break
         
-        return "N/A"
+        return f"{best_match.group('weight')} CT" if best_match else "N/A"
     
     def _extract_gold_type(self, product_name: str) -> str:
         """Extract gold type from product name"""
         if not product_name or product_name == "N/A":
             return "N/A"
         
-        # Try multiple gold type patterns for Fields
-        gold_patterns = [
-            r"\b\d{1,2}ct\s+(?:yellow|white|rose)\s+gold\b",
-            r"\b(?:9ct|9ct|14k|18k|24k)\s+(?:yellow|white|rose)\s+gold\b",
-            r"\b(?:yellow|white|rose)\s+gold\b",
-            r"\bsterling\s+silver\b",
-            r"\bplatinum\b"
-        ]
-        
-        for pattern in gold_patterns:
-            gold_type_match = re.search(pattern, product_name, re.IGNORECASE)
-            if gold_type_match:
-                return gold_type_match.group().upper()
+        # Single scan; a karat + colour match wins, otherwise keep the highest priority alternative
+        best_match = None
+        for gold_type_match in _GOLD_TYPE_RE.finditer(product_name):
+            if best_match is None or gold_type_match.lastindex < best_match.lastindex:
+                best_match = gold_type_match
+                if best_match.lastindex == 1:
+                    break
         
-        return "N/A"
+        return best_match.group().upper() if best_match else "N/A"
     
-    def _extract_badges(self, soup) -> list:
-        """Extract badge information from Fields product"""
+    def _extract_badges_and_promotions(self, soup) -> tuple:
+        """Extract badges and promotion text from Fields product in one pass over .tile-badges"""
         badges = []
+        promotions = "N/A"
         
         try:
             # Extract sale badges and other badges
-            badge_elements = soup.select('.tile-badges .lozenges')
-            for badge_element in badge_elements:
+            for index, badge_element in enumerate(soup.select('.tile-badges .lozenges')):
+                # For Fields, the first badge (discount percentage) serves as promotion info
+                if index == 0:
+                    promotions = badge_element.get_text(strip=True) or "N/A"
                 badge_text = self.clean_text(badge_element.get_text())
                 if badge_text:
                     badges.append(badge_text)
         except Exception as e:
             logger.warning(f"Error extracting badges: {e}")
         
-        return badges if badges else ["N/A"]
-    
-    def _extract_promotions(self, soup) -> str:
-        """Extract promotion text from Fields product"""
-        # For Fields, the discount percentage serves as promotion info
-        badge_element = soup.select_one('.tile-badges .lozenges')
-        if badge_element:
-            badge_text = badge_element.get_text(strip=True)
-            return badge_text if badge_text else "N/A"
-        
-        return "N/A"
+        return (badges if badges else ["N/A"]), promotions
     
     def _normalize_image_url(self, url: str) -> str:
         """Normalize image URL for Fields"""
@@ -463,8 +474,8 @@ class FieldsScraper:
                     response.raise_for_status()
                     
                     # Verify it's actually an image
-                    content_type = response.headers.get('content-type', '')
-                    if not content_type.startswith('image/'):
+                    if not self._is_image_response(response):
+                        content_type = response.headers.get('content-type', '')
                         logger.warning(f"URL {high_res_url} returned non-image content type: {content_type}")
                         continue
                         
@@ -485,8 +496,8 @@ class FieldsScraper:
                 response.raise_for_status()
                 
                 # Verify it's actually an image
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
+                if not self._is_image_response(response):
+                    content_type = response.headers.get('content-type', '')
                     logger.warning(f"Original URL {image_url} returned non-image content type: {content_type}")
                     return "N/A"
                     
@@ -500,6 +511,12 @@ class FieldsScraper:
                 logger.error(f"Fallback failed for {product_name}: {e}")
                 return "N/A"
     
+    def _is_image_response(self, response) -> bool:
+        """True for an image/* content type, or for a known image signature when the CDN mislabels it"""
+        if response.headers.get('content-type', '').startswith('image/'):
+            return True
+        return response.content[:3] in _IMAGE_MAGIC
+    
     def extract_price_value(self, text: str) -> str:
         """Extract price from text"""
         if not text:
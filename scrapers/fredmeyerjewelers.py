@@ -1,17 +1,18 @@
 import asyncio
 import base64
 import os
-import time
 import uuid
 import logging
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+import soupsieve as sv
 import re
 from typing import Dict, Any, List
-import requests
+import httpx
 from urllib.parse import urlparse
 from openpyxl import Workbook
-from database.db_inseartin import insert_into_db, update_product_count
+from database.db_inseartin import insert_into_db
+from scrapers.scrape_utils import compile_prioritized, search_prioritized, stream_image_to_file
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +21,80 @@ logger = logging.getLogger(__name__)
 IMAGE_SAVE_PATH = os.getenv("IMAGE_SAVE_PATH")
 EXCEL_DATA_PATH = os.getenv("EXCEL_DATA_PATH")
 
+BASE_URL = 'https://www.fredmeyerjewelers.com'
+
+# Rows per database insert transaction
+DB_BATCH_SIZE = 500
+
+# Non-5xx HTTP statuses that are worth retrying (request timeout, rate limited)
+RETRYABLE_STATUS_CODES = {408, 429}
+
+# Bytes per streamed image chunk
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# Bytes read per base64 chunk (multiple of 3)
+BASE64_CHUNK_SIZE = 57 * 1024
+
+# Precompiled patterns used in the per-product hot loop
+# Standard price format ("$1,299.99"); also covers the stricter formatted-price pattern
+_PRICE_RE = re.compile(r'\$[\d,]+\.?\d*')
+_WS_RE = re.compile(r'\s+')
+
+# Multiple ways to find Fred Meyer Jewelers products, in priority order
+_PRODUCT_SELECTOR_STRINGS = [
+    'article.x-result',  # Main product container
+    '.x-base-grid__result',  # Grid result item
+    '[data-wysiwyg="result"]',  # Products with wysiwyg data
+    '[data-test="search-grid-result"]',  # Search grid results
+    '.x-base-grid__item'  # Grid items
+]
+_PRODUCT_SEL = sv.compile(', '.join(_PRODUCT_SELECTOR_STRINGS))
+_PRODUCT_SELECTORS = [sv.compile(selector) for selector in _PRODUCT_SELECTOR_STRINGS]
+
+# Compiled union selectors: one tree walk per field instead of one per alternative selector
+_NAME_SEL = sv.compile(
+    'h2[data-test="result-title"], .x-text1-lg, [data-wysiwyg-title], '
+    '.x-result__description h2, h2.x-line-clamp-2'
+)
+_CURRENT_PRICE_SEL = sv.compile('[data-test="result-current-price"], .x-result-current-price')
+_PREVIOUS_PRICE_SEL = sv.compile('[data-test="result-previous-price"], .x-result-previous-price')
+_IMAGE_SEL = sv.compile(
+    'img[data-test="result-picture-image"], .x-result-picture-image, img.x-picture-image, '
+    '[data-wysiwyg-image-url], .x-result__picture img'
+)
+_LINK_SEL = sv.compile(
+    'a[data-test="result-link"], .x-result-link, a.x-result__picture, a.x-result__description'
+)
+_BADGE_SEL = sv.compile('.x-badge, .x-badge-circle, [data-test*="badge"], .x-text2-lg')
+_PROMO_SEL = sv.compile(
+    '[data-test="result-previous-price"], .x-result-previous-price, .x-line-through'
+)
+
+
+# Diamond weight patterns for Fred Meyer Jewelers, in priority order
+_WEIGHT_RE = compile_prioritized((
+    r'(\d+(?:\/\d+)?)\s*ct\.?\s*(?:tw\.?)?',  # "1/5 ct." or "1/2 ct. tw."
+    r'(\d+(?:\.\d+)?)\s*ct\s*tw',  # "1.5 ct tw"
+    r'(\d+(?:\.\d+)?)\s*ctw',  # "1.5ctw"
+    r'(\d+(?:\.\d+)?)\s*carat',  # "1.5 carat"
+    r'(\d+/\d+)\s*ct',  # "1/2 ct"
+    r'(\d+-\d+/\d+)\s*ct',  # "1-1/2 ct"
+    r'(\d+(?:\.\d+)?)\s*ct',  # "1.5 ct"
+    r'(\d+(?:\.\d+)?)\s*carats'  # "1.5 carats"
+))
+
+# Gold type patterns for Fred Meyer Jewelers, in priority order
+_GOLD_RE = compile_prioritized((
+    r'(\d{1,2}K)\s*(?:Yellow|White|Rose)\s*Gold',  # "14K Yellow Gold"
+    r'(Yellow|White|Rose)\s*Gold\s*(\d{1,2}K)',  # "Yellow Gold 14K"
+    r'(\d{1,2}K)\s*Gold',  # "14K Gold"
+    r'(Platinum|Sterling Silver|Silver)',  # Other metals
+    r'(Yellow Gold|White Gold|Rose Gold)',  # Gold colors
+    r'(\d{1,2}K)\s*(?:YG|WG|RG)',  # "14K YG"
+    r'(White|Yellow|Rose)\s*(\d{1,2}K)',  # "White 14K"
+    r'in\s*(\d{1,2}K)\s*(?:White|Yellow|Rose)\s*Gold'  # "in 14K White Gold"
+))
+
 
 class FredMeyerJewelersParser:
     """Parser for Fred Meyer Jewelers product pages with database and Excel functionality"""
@@ -65,13 +140,13 @@ class FredMeyerJewelersParser:
             excel_path = os.path.join(self.excel_data_path, excel_filename)
             
             # Process products
-            database_records = []
+            database_records = []  # pending batch, flushed every DB_BATCH_SIZE rows
+            total_count = 0
             successful_downloads = 0
             
-            # Create Excel workbook
-            wb = Workbook()
-            sheet = wb.active
-            sheet.title = "Fred Meyer Products"
+            # Create Excel workbook (write-only mode streams rows instead of keeping cell objects)
+            wb = Workbook(write_only=True)
+            sheet = wb.create_sheet("Fred Meyer Products")
             
             # Add headers
             headers = [
@@ -82,23 +157,34 @@ class FredMeyerJewelersParser:
             ]
             sheet.append(headers)
             
-            # Process each product
-            for i, product_html in enumerate(individual_products):
+            # Per-scrape constants for the Excel rows
+            date_str = current_date.strftime('%Y-%m-%d')
+            time_str = current_time.strftime('%H:%M:%S')
+            
+            # First pass: parse every product so all image downloads can run together
+            parsed_products = []
+            for i, product_tile in enumerate(individual_products):
+                parsed_data = self._try_parse_product(i, product_tile)
+                if parsed_data is None:
+                    continue
+                
+                # Generate unique ID
+                unique_id = str(uuid.uuid4())
+                product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
+                
+                parsed_products.append((unique_id, product_name, parsed_data))
+            
+            # Download images concurrently over one pooled client
+            image_paths = asyncio.run(self.download_images(
+                [(parsed_data.get('image_url'), product_name, unique_id)
+                 for unique_id, product_name, parsed_data in parsed_products],
+                image_folder
+            ))
+            
+            # Second pass: build database records and Excel rows in page order
+            for i, ((unique_id, product_name, parsed_data), image_path) in enumerate(zip(parsed_products, image_paths)):
                 try:
-                    # Parse product data
-                    print(f"Parsing product {i+1}/{len(individual_products)}")
-                    parsed_data = self.parse_product(product_html)
-                    
-                    # Generate unique ID
-                    unique_id = str(uuid.uuid4())
-                    product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
-                    
-                    # Download image - use sync method
                     image_url = parsed_data.get('image_url')
-                    image_path = self.download_image(
-                        image_url, product_name, image_folder, unique_id
-                    )
-                    
                     if image_path != "N/A":
                         successful_downloads += 1
                     
@@ -128,11 +214,12 @@ class FredMeyerJewelersParser:
                     }
                     
                     database_records.append(db_record)
+                    total_count += 1
                     
                     # Add to Excel
                     sheet.append([
                         unique_id,
-                        current_date.strftime('%Y-%m-%d'),
+                        date_str,
                         page_title,
                         product_name,
                         image_path,
@@ -140,7 +227,7 @@ class FredMeyerJewelersParser:
                         parsed_data.get('price', 'N/A'),
                         parsed_data.get('diamond_weight', 'N/A'),
                         additional_info,
-                        current_time.strftime('%H:%M:%S'),
+                        time_str,
                         image_url,
                         parsed_data.get('link', 'N/A'),
                         session_id,
@@ -152,27 +239,31 @@ class FredMeyerJewelersParser:
                 except Exception as e:
                     print(f"Error processing product {i}: {e}")
                     continue
+                
+                # Flush a full batch outside the per-product handler, so a failed insert fails the request
+                if len(database_records) >= DB_BATCH_SIZE:
+                    self._insert_batch(database_records)
+                    database_records.clear()
             
             # Save Excel file
             wb.save(excel_path)
             print(f"Excel file saved: {excel_path}")
             
-            # Insert data into the database and update product count
-            insert_into_db(database_records)
-            update_product_count(len(database_records))
+            # Insert the remaining batch and update product count
+            if database_records:
+                self._insert_batch(database_records)
             
             # Encode Excel file to base64
-            with open(excel_path, "rb") as file:
-                base64_file = base64.b64encode(file.read()).decode("utf-8")
+            base64_file = self.encode_file_base64(excel_path)
             
             # Return JSON response
             return {
-                'message': f'Successfully processed {len(database_records)} products',
+                'message': f'Successfully processed {total_count} products',
                 'session_id': session_id,
                 'excel_file': excel_filename,
-                'total_processed': len(database_records),
+                'total_processed': total_count,
                 'images_downloaded': successful_downloads,
-                'failed': len(individual_products) - len(database_records),
+                'failed': len(individual_products) - total_count,
                 'website_type': 'fredmeyer',
                 'base64_file': base64_file,
                 'file_path': excel_path
@@ -185,43 +276,50 @@ class FredMeyerJewelersParser:
                 'message': 'Failed to process products'
             }
     
-    def parse_product(self, product_html: str) -> Dict[str, Any]:
-        """Parse individual product HTML"""
-        soup = BeautifulSoup(product_html, 'html.parser')
+    def parse_product(self, soup: Tag) -> Dict[str, Any]:
+        """Parse individual product tile (already parsed page node)"""
+        product_name = self._extract_product_name(soup)
         
         return {
-            'product_name': self._extract_product_name(soup),
+            'product_name': product_name,
             'price': self._extract_price(soup),
             'image_url': self._extract_image(soup),
             'link': self._extract_link(soup),
-            'diamond_weight': self._extract_diamond_weight(soup),
-            'gold_type': self._extract_gold_type(soup),
+            'diamond_weight': self.extract_diamond_weight_value(product_name),
+            'gold_type': self.extract_gold_type_value(product_name),
             'badges': self._extract_badges(soup),
             'promotions': self._extract_promotions(soup)
         }
     
-    def extract_individual_products_from_html(self, html_content: str) -> List[str]:
-        """Extract individual product HTML blocks from Fred Meyer Jewelers HTML"""
+    def _insert_batch(self, batch: List[Dict]):
+        """Insert one batch; insert_into_db logs and swallows database errors, so check its count"""
+        inserted = insert_into_db(batch, update_count=True)
+        if inserted != len(batch):
+            raise RuntimeError(f"Database insert stored {inserted} of {len(batch)} records")
+    
+    def _try_parse_product(self, index: int, product_tile: Tag):
+        """Parse one product tile; returns None if parsing fails"""
+        try:
+            print(f"Parsing product {index+1}")
+            return self.parse_product(product_tile)
+        except Exception as e:
+            print(f"Error processing product {index}: {e}")
+            return None
+    
+    def extract_individual_products_from_html(self, html_content: str) -> List[Tag]:
+        """Extract individual product tiles from Fred Meyer Jewelers HTML"""
         if not html_content:
             return []
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Multiple ways to find Fred Meyer Jewelers products
-        product_selectors = [
-            'article.x-result',  # Main product container
-            '.x-base-grid__result',  # Grid result item
-            '[data-wysiwyg="result"]',  # Products with wysiwyg data
-            '[data-test="search-grid-result"]',  # Search grid results
-            '.x-base-grid__item'  # Grid items
-        ]
+        soup = BeautifulSoup(html_content, 'lxml')
         
+        # Single traversal with the union of all product selectors; then keep the matches of the
+        # first selector (in priority order) that found products, so nested containers are not doubled
+        product_tiles = _PRODUCT_SEL.select(soup)
         individual_products = []
         
-        for selector in product_selectors:
-            product_tiles = soup.select(selector)
-            for tile in product_tiles:
-                individual_products.append(str(tile))
+        for selector in _PRODUCT_SELECTORS:
+            individual_products = [tile for tile in product_tiles if selector.match(tile)]
             if individual_products:
                 break  # Stop if we found products with this selector
         
@@ -230,18 +328,9 @@ class FredMeyerJewelersParser:
     
     def _extract_product_name(self, soup) -> str:
         """Extract product name from Fred Meyer Jewelers product tile"""
-        # Try multiple selectors for product name
-        name_selectors = [
-            'h2[data-test="result-title"]',  # Result title
-            '.x-text1-lg',  # Text class
-            '[data-wysiwyg-title]',  # Wysiwyg title attribute
-            '.x-result__description h2',  # Result description header
-            'h2.x-line-clamp-2'  # Clamped title
-        ]
-        
-        for selector in name_selectors:
-            name_element = soup.select_one(selector)
-            if name_element and name_element.get_text(strip=True):
+        # First title element (result title, text class, wysiwyg title, clamped header) with text
+        for name_element in _NAME_SEL.iselect(soup):
+            if name_element.get_text(strip=True):
                 return self.clean_text(name_element.get_text())
         
         return "N/A"
@@ -274,38 +363,8 @@ class FredMeyerJewelersParser:
 
     def _extract_price(self, soup) -> str:
         """Extract current + previous price for Fred Meyer Jewelers"""
-
-        current_selectors = [
-            '[data-test="result-current-price"]',
-            '.x-result-current-price',
-        ]
-        previous_selectors = [
-            '[data-test="result-previous-price"]',
-            '.x-result-previous-price',
-        ]
-
-        current_price = None
-        previous_price = None
-        
-        # extract current
-        for selector in current_selectors:
-            el = soup.select_one(selector)
-            if el:
-                text = el.get_text(strip=True)
-                price = self.extract_price_value(text)
-                if price != "N/A":
-                    current_price = price
-                    break
-
-        # extract previous
-        for selector in previous_selectors:
-            el = soup.select_one(selector)
-            if el:
-                text = el.get_text(strip=True)
-                price = self.extract_price_value(text)
-                if price != "N/A":
-                    previous_price = price
-                    break
+        current_price = self._first_price(soup, _CURRENT_PRICE_SEL)
+        previous_price = self._first_price(soup, _PREVIOUS_PRICE_SEL)
 
         if current_price and previous_price:
             return f"{current_price} | {previous_price}"
@@ -318,39 +377,22 @@ class FredMeyerJewelersParser:
 
         return "N/A"
 
+    def _first_price(self, soup, selector):
+        """Return the first valid price among elements matching a compiled selector"""
+        for el in selector.iselect(soup):
+            price = self.extract_price_value(el.get_text(strip=True))
+            if price != "N/A":
+                return price
+        return None
     
     def _extract_image(self, soup) -> str:
         """Extract product image URL from Fred Meyer Jewelers product"""
-        # Image selectors
-        img_selectors = [
-            'img[data-test="result-picture-image"]',  # Result picture image
-            '.x-result-picture-image',  # Result picture class
-            'img.x-picture-image',  # Picture image class
-            '[data-wysiwyg-image-url]',  # Wysiwyg image URL attribute
-            '.x-result__picture img'  # Result picture img
-        ]
-        
-        for selector in img_selectors:
-            img_element = soup.select_one(selector)
-            if img_element:
-                # Check src first
-                if img_element.get('src'):
-                    src = img_element.get('src')
-                    normalized_url = self._normalize_image_url(src)
-                    if normalized_url != "N/A":
-                        return normalized_url
-                
-                # Check for data attribute
-                if img_element.get('data-wysiwyg-image-url'):
-                    src = img_element.get('data-wysiwyg-image-url')
-                    normalized_url = self._normalize_image_url(src)
-                    if normalized_url != "N/A":
-                        return normalized_url
-                
-                # Check for data-src (lazy loading)
-                if img_element.get('data-src'):
-                    src = img_element.get('data-src')
-                    normalized_url = self._normalize_image_url(src)
+        for img_element in _IMAGE_SEL.iselect(soup):
+            # Check src first, then the wysiwyg data attribute, then data-src (lazy loading)
+            for attribute in ('src', 'data-wysiwyg-image-url', 'data-src'):
+                src = img_element.get(attribute)
+                if src:
+                    normalized_url = self._normalize_url(src)
                     if normalized_url != "N/A":
                         return normalized_url
         
@@ -358,76 +400,39 @@ class FredMeyerJewelersParser:
     
     def _extract_link(self, soup) -> str:
         """Extract product link from Fred Meyer Jewelers product"""
-        # Link selectors
-        link_selectors = [
-            'a[data-test="result-link"]',  # Result link
-            '.x-result-link',  # Result link class
-            'a.x-result__picture',  # Picture link
-            'a.x-result__description'  # Description link
-        ]
-        
-        for selector in link_selectors:
-            link_element = soup.select_one(selector)
-            if link_element and link_element.get('href'):
-                href = link_element.get('href')
-                return self._normalize_link_url(href)
+        for link_element in _LINK_SEL.iselect(soup):
+            href = link_element.get('href')
+            if href:
+                return self._normalize_url(href, is_link=True)
         
         return "N/A"
     
-    def _extract_diamond_weight(self, soup) -> str:
-        """Extract diamond weight from product name"""
-        product_name = self._extract_product_name(soup)
-        return self.extract_diamond_weight_value(product_name)
-    
-    def _extract_gold_type(self, soup) -> str:
-        """Extract gold type from product name"""
-        product_name = self._extract_product_name(soup)
-        return self.extract_gold_type_value(product_name)
-    
     def _extract_badges(self, soup) -> list:
         """Extract badge information from Fred Meyer Jewelers product"""
         badges = []
         
-        # Badge selectors - Fred Meyer Jewelers uses different badge system
-        badge_selectors = [
-            '.x-badge',  # Badge class
-            '.x-badge-circle',  # Circle badge
-            '[data-test*="badge"]',  # Test attributes with badge
-            '.x-text2-lg'  # Text that might contain badge info
-        ]
-        
-        for selector in badge_selectors:
-            badge_elements = soup.select(selector)
-            for badge in badge_elements:
-                badge_text = self.clean_text(badge.get_text())
-                if badge_text and badge_text not in badges:
-                    # Filter out common non-badge text
-                    if not any(excluded in badge_text.lower() for excluded in ['in stock', 'items:', 'results']):
-                        badges.append(badge_text)
+        # Fred Meyer Jewelers uses different badge system (badge classes, badge test ids, text2 labels)
+        for badge in _BADGE_SEL.select(soup):
+            badge_text = self.clean_text(badge.get_text())
+            if badge_text and badge_text not in badges:
+                # Filter out common non-badge text
+                if not any(excluded in badge_text.lower() for excluded in ['in stock', 'items:', 'results']):
+                    badges.append(badge_text)
         
         return badges
     
     def _extract_promotions(self, soup) -> str:
         """Extract promotion text from Fred Meyer Jewelers product"""
-        # Promotion selectors
-        promo_selectors = [
-            '[data-test="result-previous-price"]',  # Previous price (indicates sale)
-            '.x-result-previous-price',  # Previous price class
-            '.x-line-through'  # Strikethrough text (sale indication)
-        ]
-        
         promo_texts = []
         
-        # Check for sale indicators
-        for selector in promo_selectors:
-            promo_elements = soup.select(selector)
-            for promo in promo_elements:
-                promo_text = self.clean_text(promo.get_text())
-                if promo_text and promo_text.startswith('$'):
-                    promo_texts.append(f"Was {promo_text}")
+        # Check for sale indicators (previous price or strikethrough text); only prices count
+        for promo in _PROMO_SEL.select(soup):
+            promo_text = self.clean_text(promo.get_text())
+            if promo_text and promo_text.startswith('$'):
+                promo_texts.append(f"Was {promo_text}")
         
-        # Check for any discount indicators in the text
-        if "on-sale" in soup.get('class', []):
+        # Check the product tile's own class for a sale marker
+        if "on-sale" in (soup.get('class') or ()):
             promo_texts.append("On Sale")
         
         if promo_texts:
@@ -435,39 +440,56 @@ class FredMeyerJewelersParser:
         
         return "N/A"
     
-    def _normalize_image_url(self, url: str) -> str:
-        """Normalize image URL for Fred Meyer Jewelers"""
+    def _normalize_url(self, url: str, is_link: bool = False) -> str:
+        """Normalize image/link URL for Fred Meyer Jewelers (links are not stripped and bare relative links are kept as-is)"""
         if not url or url == "N/A":
             return "N/A"
         
         # Clean the URL
-        url = url.strip()
+        if not is_link:
+            url = url.strip()
         
         if url.startswith('http'):
             return url
-        elif url.startswith('//'):
-            return f"https:{url}"
-        elif url.startswith('/'):
-            return f"https://www.fredmeyerjewelers.com{url}"
-        else:
-            # For relative URLs without leading slash
-            return f"https://www.fredmeyerjewelers.com/{url}"
-    
-    def _normalize_link_url(self, url: str) -> str:
-        """Normalize link URL for Fred Meyer Jewelers"""
-        if not url:
-            return "N/A"
-        if url.startswith('http'):
-            return url
-        elif url.startswith('//'):
-            return f"https:{url}"
-        elif url.startswith('/'):
-            return f"https://www.fredmeyerjewelers.com{url}"
-        return url
+        if url.startswith('//'):
+            return 'https:' + url
+        if url.startswith('/'):
+            return BASE_URL + url
+        # For relative URLs without leading slash
+        return url if is_link else BASE_URL + '/' + url
 
-    def download_image(self, image_url: str, product_name: str, image_folder: str, unique_id: str, retries: int = 2) -> str:
+    async def download_images(self, jobs: List[tuple], image_folder: str, concurrency: int = 16) -> List[str]:
         """
-        Ultra-simple image download with minimal headers and faster timeouts
+        Download (image_url, product_name, unique_id) jobs concurrently over one pooled client.
+        Returns image paths in job order ("N/A" for failures).
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        # Minimal headers - sometimes less is more
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "image/*",
+        }
+        
+        # Keep-alive pool sized for one CDN host; the transport retries failed connects
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            retries=3
+        )
+        
+        # Short timeout - fail fast; follow CDN redirects as requests.get did
+        async with httpx.AsyncClient(
+            headers=headers, timeout=8.0, transport=transport, follow_redirects=True
+        ) as client:
+            async def bounded_download(image_url, product_name, unique_id):
+                async with semaphore:
+                    return await self.download_image_async(client, image_url, product_name, image_folder, unique_id)
+            
+            return await asyncio.gather(*(bounded_download(*job) for job in jobs))
+    
+    async def download_image_async(self, client: httpx.AsyncClient, image_url: str, product_name: str, image_folder: str, unique_id: str, retries: int = 2) -> str:
+        """
+        Ultra-simple image download using the shared client and fast timeouts
         """
         if not image_url or image_url == "N/A":
             return "N/A"
@@ -479,38 +501,52 @@ class FredMeyerJewelersParser:
             try:
                 logger.info(f"Download attempt {attempt + 1} for: {product_name}")
                 
-                # Minimal headers - sometimes less is more
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                    "Accept": "image/*",
-                }
-
-                # Short timeout - fail fast
-                response = requests.get(image_url, headers=headers, timeout=8)
-                
-                if response.status_code == 200:
-                    # Basic content check
-                    if len(response.content) < 1000:
-                        logger.warning("Response too small, likely not an image")
-                        continue
+                async with client.stream("GET", image_url) as response:
+                    if response.status_code == 200:
+                        # Stream to disk so per-image memory stays bounded by the chunk size,
+                        # without blocking the event loop for the other downloads
+                        rejection = await stream_image_to_file(response, image_full_path, IMAGE_CHUNK_SIZE)
+                        if rejection:
+                            logger.warning(f"Attempt {attempt + 1} failed: {rejection}, not retrying")
+                            break
+                        
+                        # Basic content check
+                        if os.path.getsize(image_full_path) <= 1000:
+                            logger.warning("Response too small, likely not an image")
+                            os.remove(image_full_path)
+                            continue
                         
-                    # Save file
-                    with open(image_full_path, 'wb') as f:
-                        f.write(response.content)
-                    
-                    # Quick verification
-                    if os.path.exists(image_full_path) and os.path.getsize(image_full_path) > 1000:
                         logger.info(f"✅ Downloaded: {product_name}")
                         return image_full_path
+                    
+                    # Only server errors, timeouts and rate limits are worth retrying (not 404/410 etc.)
+                    if response.status_code not in RETRYABLE_STATUS_CODES and response.status_code < 500:
+                        logger.warning(f"Attempt {attempt + 1} failed: HTTP {response.status_code}, not retrying")
+                        break
+                    logger.warning(f"Attempt {attempt + 1} failed: HTTP {response.status_code}")
                         
+            except httpx.TransportError as e:
+                # Timeouts and connection errors are retriable
+                logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
             except Exception as e:
                 logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt < retries - 1:
-                    time.sleep(1)
+                break
+            
+            if attempt < retries - 1:
+                await asyncio.sleep(0.5 * 2 ** attempt)
 
         logger.error(f"❌ Failed: {product_name}")
         return "N/A"
         
+    def encode_file_base64(self, file_path: str) -> str:
+        """Base64-encode a file in chunks so the raw file is never held in memory as a whole"""
+        encoded_parts = []
+        with open(file_path, "rb") as file:
+            # Chunk size is a multiple of 3, so chunks encode without padding and concatenate cleanly
+            for chunk in iter(lambda: file.read(BASE64_CHUNK_SIZE), b""):
+                encoded_parts.append(base64.b64encode(chunk).decode("ascii"))
+        return "".join(encoded_parts)
+    
     def _clean_filename(self, filename: str) -> str:
         """Clean filename to remove invalid characters"""
         if not filename:
@@ -520,7 +556,7 @@ class FredMeyerJewelersParser:
         for char in invalid_chars:
             filename = filename.replace(char, '_')
         # Remove multiple spaces and trim
-        filename = re.sub(r'\s+', ' ', filename).strip()
+        filename = _WS_RE.sub(' ', filename).strip()
         # Limit filename length
         if len(filename) > 100:
             filename = filename[:100]
@@ -532,53 +568,28 @@ class FredMeyerJewelersParser:
             return "N/A"
         
         # Look for price patterns
-        price_patterns = [
-            r'\$[\d,]+\.?\d*',  # Standard price format
-            r'\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?',  # Formatted price
-        ]
-        
-        for pattern in price_patterns:
-            price_match = re.search(pattern, text)
-            if price_match:
-                return price_match.group(0)
-        
-        return "N/A"
+        price_match = _PRICE_RE.search(text)
+        return price_match.group(0) if price_match else "N/A"
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
             return ""
-        # Remove extra whitespace and normalize
-        text = ' '.join(text.split()).strip()
-        # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        return text
+        # Collapse every whitespace run to a single space (split() already trims the ends)
+        return ' '.join(text.split())
     
     def extract_diamond_weight_value(self, text: str) -> str:
         """Extract diamond weight from text"""
         if not text:
             return "N/A"
         
-        # Diamond weight patterns for Fred Meyer Jewelers
-        weight_patterns = [
-            r'(\d+(?:\/\d+)?)\s*ct\.?\s*(?:tw\.?)?',  # "1/5 ct." or "1/2 ct. tw."
-            r'(\d+(?:\.\d+)?)\s*ct\s*tw',  # "1.5 ct tw"
-            r'(\d+(?:\.\d+)?)\s*ctw',  # "1.5ctw"
-            r'(\d+(?:\.\d+)?)\s*carat',  # "1.5 carat"
-            r'(\d+/\d+)\s*ct',  # "1/2 ct"
-            r'(\d+-\d+/\d+)\s*ct',  # "1-1/2 ct"
-            r'(\d+(?:\.\d+)?)\s*ct',  # "1.5 ct"
-            r'(\d+(?:\.\d+)?)\s*carats'  # "1.5 carats"
-        ]
-        
-        for pattern in weight_patterns:
-            weight_match = re.search(pattern, text, re.IGNORECASE)
-            if weight_match:
-                weight = weight_match.group(1)
-                # Standardize the format
-                if 'tw' not in text.lower() and 't.w.' not in text:
-                    return f"{weight} ct tw"
-                return f"{weight} ct"
+        weight_groups = search_prioritized(_WEIGHT_RE, text)
+        if weight_groups:
+            weight = weight_groups[0]
+            # Standardize the format
+            if 'tw' not in text.lower() and 't.w.' not in text:
+                return f"{weight} ct tw"
+            return f"{weight} ct"
         
         return "N/A"
     
@@ -587,23 +598,10 @@ class FredMeyerJewelersParser:
         if not text:
             return "N/A"
         
-        # Gold type patterns for Fred Meyer Jewelers
-        gold_patterns = [
-            r'(\d{1,2}K)\s*(?:Yellow|White|Rose)\s*Gold',  # "14K Yellow Gold"
-            r'(Yellow|White|Rose)\s*Gold\s*(\d{1,2}K)',  # "Yellow Gold 14K"
-            r'(\d{1,2}K)\s*Gold',  # "14K Gold"
-            r'(Platinum|Sterling Silver|Silver)',  # Other metals
-            r'(Yellow Gold|White Gold|Rose Gold)',  # Gold colors
-            r'(\d{1,2}K)\s*(?:YG|WG|RG)',  # "14K YG"
-            r'(White|Yellow|Rose)\s*(\d{1,2}K)',  # "White 14K"
-            r'in\s*(\d{1,2}K)\s*(?:White|Yellow|Rose)\s*Gold'  # "in 14K White Gold"
-        ]
-        
-        for pattern in gold_patterns:
-            gold_match = re.search(pattern, text, re.IGNORECASE)
-            if gold_match:
-                # Return the matched groups, filtering out None
-                gold_parts = [part for part in gold_match.groups() if part]
-                return ' '.join(gold_parts).title()
+        gold_groups = search_prioritized(_GOLD_RE, text)
+        if gold_groups:
+            # Return the matched groups, filtering out None
+            gold_parts = [part for part in gold_groups if part]
+            return ' '.join(gold_parts).title()
         
         return "N/A"
\ No newline at end of file
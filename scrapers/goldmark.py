@@ -1,16 +1,19 @@
 import asyncio
 import base64
+import io
 import os
 import uuid
 import logging
+import random
 from datetime import datetime
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 import re
 from typing import Dict, Any, List
 import httpx
 from urllib.parse import urlparse
-from openpyxl import Workbook
-from database.db_inseartin import insert_into_db, update_product_count
+from scrapers.xlsx_writer import XlsxSheetWriter
+from scrapers.scrape_utils import node_matches, reject_image_response, stream_image_to_file
+from database.db_inseartin import insert_into_db, build_db_row
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -19,13 +22,59 @@ logger = logging.getLogger(__name__)
 IMAGE_SAVE_PATH = os.getenv("IMAGE_SAVE_PATH")
 EXCEL_DATA_PATH = os.getenv("EXCEL_DATA_PATH")
 
+# HTTP/2 lets all image requests to the CDN share one multiplexed connection (needs httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Bytes per streamed image chunk
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# HTTP statuses worth retrying (timeouts, rate limiting, transient server errors)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Upper bound in seconds for a single retry delay
+MAX_RETRY_DELAY = 30
+
+# Goldmark specific product selectors, in priority order
+_PRODUCT_SELECTORS = [
+    'div.ps-category-item',  # Main product container
+    'div.s-product',         # Product item
+    '.ps-category-items > div',  # Direct children of category items
+    '[id^="product-"]'       # Products with product ID
+]
+_PRODUCT_SELECTOR_UNION = ', '.join(_PRODUCT_SELECTORS)
+
+# Precompiled patterns used in the per-product hot loop
+_DIAMOND_WEIGHT_RE = re.compile(r"\d+(\.\d+)?\s*(CT|CARAT)\s+TW", re.IGNORECASE)
+# Gold type patterns as one alternation, in priority order; match.lastindex is the
+# pattern's rank. None of them can start inside another's match, so a single
+# non-overlapping scan sees every candidate
+_GOLD_TYPE_RE = re.compile(
+    r"(?P<karat_ct>\b\d{1,2}CT(?:\s+(?:ROSE|YELLOW|WHITE))?\s+GOLD\b)"
+    r"|(?P<karat>\b(?:9CT|14K|18K|24K)\s+(?:YELLOW|WHITE|ROSE)\s+GOLD\b)"
+    r"|(?P<color>\b(?:YELLOW|WHITE|ROSE)\s+GOLD\b)"
+    r"|(?P<silver>\bSTERLING\s+SILVER\b)"
+    r"|(?P<platinum>\bPLATINUM\b)",
+    re.IGNORECASE
+)
+# Standard price format ("$1,299.99"); also covers the stricter formatted-price pattern
+_PRICE_RE = re.compile(r'\$[\d,]+\.?\d*')
+_WIDTH_RE = re.compile(r'width=\d+')
+
 
 class GoldmarkScraper:
     """Parser for Goldmark.com.au product pages with database and Excel functionality"""
     
-    def __init__(self, excel_data_path=EXCEL_DATA_PATH, image_save_path=IMAGE_SAVE_PATH):
+    def __init__(self, excel_data_path=EXCEL_DATA_PATH, image_save_path=IMAGE_SAVE_PATH,
+                 download_concurrency=32, max_connections=128):
         self.excel_data_path = excel_data_path
         self.image_save_path = image_save_path
+        # Image download tuning: concurrent requests and pooled connections to the CDN host
+        self.download_concurrency = download_concurrency
+        self.max_connections = max_connections
         self.setup_directories()
     
     def setup_directories(self):
@@ -33,9 +82,10 @@ class GoldmarkScraper:
         os.makedirs(self.excel_data_path, exist_ok=True)
         os.makedirs(self.image_save_path, exist_ok=True)
     
-    def parse_and_save_products(self, products_data: List[Dict], page_title: str, page_url: str = "") -> Dict[str, Any]:
+    def parse_and_save_products(self, products_data: List[Dict], page_title: str, page_url: str = "", include_base64: bool = True) -> Dict[str, Any]:
         """
         Main method to parse products and save to database/Excel
+        Set include_base64=False to return only file_path and skip encoding the workbook
         Returns: JSON response compatible with your requirements
         """
         try:
@@ -55,6 +105,10 @@ class GoldmarkScraper:
             current_date = datetime.now().date()
             current_time = datetime.now().time()
             
+            # These never change within a session, so format them once
+            date_str = current_date.strftime('%Y-%m-%d')
+            time_str = current_time.strftime('%H:%M:%S')
+            
             # Create image folder for this session
             image_folder = os.path.join(self.image_save_path, f"goldmark_{timestamp}")
             os.makedirs(image_folder, exist_ok=True)
@@ -67,25 +121,12 @@ class GoldmarkScraper:
             database_records = []
             successful_downloads = 0
             
-            # Create Excel workbook
-            wb = Workbook()
-            sheet = wb.active
-            sheet.title = "Goldmark Products"
-            
-            # Add headers
-            headers = [
-                'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
-                'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
-                'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
-                'Session ID', 'Page URL'
-            ]
-            sheet.append(headers)
-            
-            # Process each product
-            for i, product_html in enumerate(individual_products):
+            # Phase 1: parse every product first so the image downloads can run concurrently
+            parsed_products = []
+            for i, product_node in enumerate(individual_products):
                 try:
                     # Parse product data
-                    parsed_data = self.parse_product(product_html)
+                    parsed_data = self.parse_product(product_node)
                     
                     # Skip if essential data is missing
                     if (parsed_data.get('product_name') == "N/A" or 
@@ -97,79 +138,107 @@ class GoldmarkScraper:
                     # Generate unique ID
                     unique_id = str(uuid.uuid4())
                     product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
-                    
-                    # Download image - use async method
-                    image_url = parsed_data.get('image_url')
-                    image_path = asyncio.run(self.download_image_async(
-                        image_url, product_name, timestamp, image_folder, unique_id
-                    ))
-                    
-                    if image_path != "N/A":
-                        successful_downloads += 1
-                    
-                    # Prepare additional info
-                    badges = parsed_data.get('badges', [])
-                    promotions = parsed_data.get('promotions', '')
-                    additional_info_parts = []
-                    
-                    if badges and badges != ["N/A"]:
-                        additional_info_parts.extend(badges)
-                    if promotions and promotions != "N/A":
-                        additional_info_parts.append(promotions)
-                    
-                    additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
-                    
-                    # Create database record
-                    db_record = {
-                        'unique_id': unique_id,
-                        'current_date': current_date,
-                        'page_title': page_title,
-                        'product_name': product_name,
-                        'image_path': image_path,
-                        'price': parsed_data.get('price'),
-                        'diamond_weight': parsed_data.get('diamond_weight'),
-                        'gold_type': parsed_data.get('gold_type'),
-                        'additional_info': additional_info,
-                    }
-                    
-                    database_records.append(db_record)
-                    
-                    # Add to Excel
-                    sheet.append([
-                        unique_id,
-                        current_date.strftime('%Y-%m-%d'),
-                        page_title,
-                        product_name,
-                        image_path,
-                        parsed_data.get('gold_type', 'N/A'),
-                        parsed_data.get('price', 'N/A'),
-                        parsed_data.get('diamond_weight', 'N/A'),
-                        additional_info,
-                        current_time.strftime('%H:%M:%S'),
-                        image_url,
-                        parsed_data.get('link', 'N/A'),
-                        session_id,
-                        page_url
-                    ])
-                    
-                    print(f"Processed product {i+1}: {product_name}")
+                    parsed_products.append((i, unique_id, product_name, parsed_data))
                     
                 except Exception as e:
                     print(f"Error processing product {i}: {e}")
                     continue
             
-            # Save Excel file
-            wb.save(excel_path)
+            # Phase 2: download all images from one event loop over a shared client
+            image_jobs = [
+                (parsed_data.get('image_url'), product_name, unique_id)
+                for _, unique_id, product_name, parsed_data in parsed_products
+            ]
+            image_paths = asyncio.run(self.download_images(image_jobs, timestamp, image_folder))
+            
+            # Phase 3: write the Excel rows and collect the database records.
+            # The workbook is only opened once the downloads are done; rows are
+            # streamed straight into an in-memory xlsx package
+            excel_buffer = io.BytesIO()
+            with XlsxSheetWriter(excel_buffer, "Goldmark Products") as sheet:
+                
+                # Add headers
+                headers = [
+                    'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
+                    'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
+                    'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
+                    'Session ID', 'Page URL'
+                ]
+                sheet.append(headers)
+                
+                for (i, unique_id, product_name, parsed_data), image_path in zip(parsed_products, image_paths):
+                    try:
+                        # A failed download drops the product, as the per-product loop did
+                        if isinstance(image_path, Exception):
+                            raise image_path
+                        
+                        image_url = parsed_data.get('image_url')
+                        
+                        if image_path != "N/A":
+                            successful_downloads += 1
+                        
+                        # Prepare additional info
+                        badges = parsed_data.get('badges', [])
+                        promotions = parsed_data.get('promotions', '')
+                        additional_info_parts = []
+                        
+                        if badges and badges != ["N/A"]:
+                            additional_info_parts.extend(badges)
+                        if promotions and promotions != "N/A":
+                            additional_info_parts.append(promotions)
+                        
+                        additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
+                        
+                        # Create database record (tuple in table column order)
+                        database_records.append(build_db_row(
+                            unique_id,
+                            current_date,
+                            page_title,
+                            product_name,
+                            image_path,
+                            parsed_data.get('price'),
+                            additional_info
+                        ))
+                        
+                        # Add to Excel
+                        sheet.append([
+                            unique_id,
+                            date_str,
+                            page_title,
+                            product_name,
+                            image_path,
+                            parsed_data.get('gold_type', 'N/A'),
+                            parsed_data.get('price', 'N/A'),
+                            parsed_data.get('diamond_weight', 'N/A'),
+                            additional_info,
+                            time_str,
+                            image_url,
+                            parsed_data.get('link', 'N/A'),
+                            session_id,
+                            page_url
+                        ])
+                        
+                        print(f"Processed product {i+1}: {product_name}")
+                        
+                    except Exception as e:
+                        print(f"Error processing product {i}: {e}")
+                        continue
+            
+            # Save Excel file (the same bytes are reused for the base64 payload, no read-back)
+            excel_bytes = excel_buffer.getvalue()
+            with open(excel_path, "wb") as file:
+                file.write(excel_bytes)
             print(f"Excel file saved: {excel_path}")
             
-            # Insert data into the database and update product count
+            # Insert data into the database and update product count in one transaction;
+            # insert_into_db logs and swallows database errors, so check its count
             if database_records:
-                insert_into_db(database_records)
-                update_product_count(len(database_records))
+                inserted = insert_into_db(database_records, update_count=True)
+                if inserted != len(database_records):
+                    raise RuntimeError(f"Database insert stored {inserted} of {len(database_records)} records")
             
-            # Encode Excel file to base64
-            with open(excel_path, "rb") as file:
-                base64_file = base64.b64encode(file.read()).decode("utf-8")
+            # Encode Excel file to base64 (callers that only need file_path can skip this)
+            base64_file = base64.b64encode(excel_bytes).decode("ascii") if include_base64 else None
             
             # Return JSON response
             return {
@@ -191,15 +260,13 @@ class GoldmarkScraper:
                 'message': 'Failed to process products'
             }
     
-    def parse_product(self, product_html: str) -> Dict[str, Any]:
-        """Parse individual product HTML"""
+    def parse_product(self, node: LexborNode) -> Dict[str, Any]:
+        """Parse an individual product tile from the page tree"""
         try:
-            soup = BeautifulSoup(product_html, 'html.parser')
-            
-            product_name = self._extract_product_name(soup)
-            price = self._extract_price(soup)
-            image_url = self._extract_image(soup)
-            link = self._extract_link(soup)
+            product_name = self._extract_product_name(node)
+            price = self._extract_price(node)
+            image_url = self._extract_image(node)
+            link = self._extract_link(node)
             
             # Skip if essential data is missing
             if product_name == "N/A" or price == "N/A" or image_url == "N/A":
@@ -221,8 +288,8 @@ class GoldmarkScraper:
                 'link': link,
                 'diamond_weight': self._extract_diamond_weight(product_name),
                 'gold_type': self._extract_gold_type(product_name),
-                'badges': self._extract_badges(soup),
-                'promotions': self._extract_promotions(soup)
+                'badges': self._extract_badges(node),
+                'promotions': self._extract_promotions(node)
             }
         except Exception as e:
             logger.error(f"Error parsing product: {e}")
@@ -237,34 +304,34 @@ class GoldmarkScraper:
                 'promotions': "N/A"
             }
     
-    def extract_individual_products_from_html(self, html_content: str) -> List[str]:
-        """Extract individual product HTML blocks from Goldmark HTML"""
+    def extract_individual_products_from_html(self, html_content: str) -> List[LexborNode]:
+        """Extract individual product tiles from Goldmark HTML (parsed once with the Lexbor C parser)"""
         if not html_content:
             return []
         
-        soup = BeautifulSoup(html_content, 'html.parser')
+        tree = LexborHTMLParser(html_content)
         
-        # Goldmark specific product selectors
-        product_selectors = [
-            'div.ps-category-item',  # Main product container
-            'div.s-product',         # Product item
-            '.ps-category-items > div',  # Direct children of category items
-            '[id^="product-"]'       # Products with product ID
-        ]
+        # Single traversal with the union of all product selectors; Lexbor reports a node once per
+        # selector it matches, so drop repeats by node identity (the order stays document order)
+        seen = set()
+        product_tiles = []
+        for tile in tree.css(_PRODUCT_SELECTOR_UNION):
+            if tile.mem_id not in seen:
+                seen.add(tile.mem_id)
+                product_tiles.append(tile)
         
+        # Keep the matches of the first selector (in priority order) that found products,
+        # so nested containers are not doubled
         individual_products = []
-        
-        for selector in product_selectors:
-            product_tiles = soup.select(selector)
-            for tile in product_tiles:
-                individual_products.append(str(tile))
+        for selector in _PRODUCT_SELECTORS:
+            individual_products = [tile for tile in product_tiles if node_matches(tile, selector)]
             if individual_products:
                 break  # Stop if we found products with this selector
         
         print(f"Found {len(individual_products)} product tiles in Goldmark HTML")
         return individual_products
     
-    def _extract_product_name(self, soup) -> str:
+    def _extract_product_name(self, node) -> str:
         """Extract product name from Goldmark product tile"""
         # Try multiple selectors for product name
         name_selectors = [
@@ -275,20 +342,20 @@ class GoldmarkScraper:
         ]
         
         for selector in name_selectors:
-            name_element = soup.select_one(selector)
-            if name_element and name_element.get_text(strip=True):
-                return self.clean_text(name_element.get_text())
+            name_element = node.css_first(selector)
+            if name_element and name_element.text(strip=True):
+                return self.clean_text(name_element.text())
         
         return "N/A"
     
-    def _extract_price(self, soup) -> str:
+    def _extract_price(self, node) -> str:
         """Extract price information from Goldmark product"""
         try:
-            price_now_element = soup.select_one('span.s-price__now')
-            price_was_element = soup.select_one('span.s-price__was')
+            price_now_element = node.css_first('span.s-price__now')
+            price_was_element = node.css_first('span.s-price__was')
             
-            price_now = price_now_element.get_text(strip=True) if price_now_element else ""
-            price_was = price_was_element.get_text(strip=True) if price_was_element else ""
+            price_now = price_now_element.text(strip=True) if price_now_element else ""
+            price_was = price_was_element.text(strip=True) if price_was_element else ""
             
             if price_now and price_was:
                 return f"{price_now} | {price_was}"
@@ -301,25 +368,24 @@ class GoldmarkScraper:
             logger.warning(f"Error extracting price: {e}")
             return "N/A"
     
-    def _extract_image(self, soup) -> str:
+    def _extract_image(self, node) -> str:
         """Extract product image URL from Goldmark product"""
         try:
-            img_element = soup.select_one('img')
+            img_element = node.css_first('img')
             if img_element:
+                attrs = img_element.attributes
                 # Prefer high-resolution images from srcset or data-srcset
-                srcset = img_element.get('data-srcset') or img_element.get('srcset')
+                srcset = attrs.get('data-srcset') or attrs.get('srcset')
                 if srcset:
-                    # Get the highest resolution image from srcset (last one)
-                    srcset_parts = srcset.strip().split(",")
-                    if srcset_parts:
-                        # Get the last entry which should be the highest resolution
-                        highest_res = srcset_parts[-1].strip().split()
-                        if highest_res:
-                            image_url = highest_res[0]
-                            return self._normalize_image_url(image_url)
+                    # Get the last entry which should be the highest resolution,
+                    # without splitting the whole candidate list
+                    highest_res = srcset.rsplit(",", 1)[-1].split(None, 1)
+                    if highest_res:
+                        image_url = highest_res[0]
+                        return self._normalize_image_url(image_url)
                 
                 # Fallback to data-src or src
-                image_url = img_element.get('data-src') or img_element.get('src')
+                image_url = attrs.get('data-src') or attrs.get('src')
                 if image_url:
                     return self._normalize_image_url(image_url)
             
@@ -328,7 +394,7 @@ class GoldmarkScraper:
             logger.warning(f"Error extracting image: {e}")
             return "N/A"
     
-    def _extract_link(self, soup) -> str:
+    def _extract_link(self, node) -> str:
         """Extract product link from Goldmark product"""
         # Link selectors for Goldmark
         link_selectors = [
@@ -340,9 +406,9 @@ class GoldmarkScraper:
         ]
         
         for selector in link_selectors:
-            link_element = soup.select_one(selector)
-            if link_element and link_element.get('href'):
-                href = link_element.get('href')
+            link_element = node.css_first(selector)
+            href = link_element.attributes.get('href') if link_element else None
+            if href:
                 return self._normalize_link_url(href)
         
         return "N/A"
@@ -352,7 +418,7 @@ class GoldmarkScraper:
         if not product_name or product_name == "N/A":
             return "N/A"
         
-        diamond_weight_match = re.search(r"\d+(\.\d+)?\s*(CT|CARAT)\s+TW", product_name, re.IGNORECASE)
+        diamond_weight_match = _DIAMOND_WEIGHT_RE.search(product_name)
         return diamond_weight_match.group().upper() if diamond_weight_match else "N/A"
     
     def _extract_gold_type(self, product_name: str) -> str:
@@ -360,31 +426,25 @@ class GoldmarkScraper:
         if not product_name or product_name == "N/A":
             return "N/A"
         
-        # Try multiple gold type patterns
-        gold_patterns = [
-            r"\b\d{1,2}CT(?:\s+(?:ROSE|YELLOW|WHITE))?\s+GOLD\b",
-            r"\b(?:9CT|14K|18K|24K)\s+(?:YELLOW|WHITE|ROSE)\s+GOLD\b",
-            r"\b(?:YELLOW|WHITE|ROSE)\s+GOLD\b",
-            r"\bSTERLING\s+SILVER\b",
-            r"\bPLATINUM\b"
-        ]
+        # Single scan; keep the highest-priority pattern found, like trying each in turn
+        best_match = None
+        for gold_type_match in _GOLD_TYPE_RE.finditer(product_name):
+            if best_match is None or gold_type_match.lastindex < best_match.lastindex:
+                best_match = gold_type_match
+                if best_match.lastindex == 1:
+                    break
         
-        for pattern in gold_patterns:
-            gold_type_match = re.search(pattern, product_name, re.IGNORECASE)
-            if gold_type_match:
-                return gold_type_match.group().upper()
-        
-        return "N/A"
+        return best_match.group().upper() if best_match else "N/A"
     
-    def _extract_badges(self, soup) -> list:
+    def _extract_badges(self, node) -> list:
         """Extract badge information from Goldmark product"""
         badges = []
         
         try:
             # Extract 'Sale' flags and other badges
-            flag_elements = soup.select('div.s-product__flag.s-flag')
+            flag_elements = node.css('div.s-product__flag.s-flag')
             for flag_element in flag_elements:
-                flag_text = self.clean_text(flag_element.get_text())
+                flag_text = self.clean_text(flag_element.text())
                 if flag_text:
                     badges.append(flag_text)
         except Exception as e:
@@ -392,12 +452,12 @@ class GoldmarkScraper:
         
         return badges if badges else ["N/A"]
     
-    def _extract_promotions(self, soup) -> str:
+    def _extract_promotions(self, node) -> str:
         """Extract promotion text from Goldmark product"""
         # For Goldmark, the price comparison itself serves as promotion info
-        price_was_element = soup.select_one('span.s-price__was')
+        price_was_element = node.css_first('span.s-price__was')
         if price_was_element:
-            was_price = price_was_element.get_text(strip=True)
+            was_price = price_was_element.text(strip=True)
             return f"Was {was_price}" if was_price else "N/A"
         
         return "N/A"
@@ -434,7 +494,7 @@ class GoldmarkScraper:
         # Goldmark uses width parameter in their image URLs
         # Change to higher resolution (1274w is the highest based on the srcset)
         if "width=" in image_url:
-            return re.sub(r'width=\d+', 'width=1274', image_url)
+            return _WIDTH_RE.sub('width=1274', image_url)
         
         # If width param is missing, append it
         if "?" in image_url:
@@ -442,7 +502,40 @@ class GoldmarkScraper:
         else:
             return image_url + "?width=1274"
 
-    async def download_image_async(self, image_url, product_name, timestamp, image_folder, unique_id, retries=3):
+    async def download_images(self, jobs: List[tuple], timestamp: str, image_folder: str) -> List[Any]:
+        """
+        Download (image_url, product_name, unique_id) jobs concurrently over one shared client
+        Returns: image path, "N/A" or the raised exception for each job, in job order
+        """
+        # Bounds in-flight requests only; a download waiting out a retry delay does not hold a slot
+        semaphore = asyncio.Semaphore(self.download_concurrency)
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "image/*,*/*;q=0.8",
+        }
+        # All images come from one CDN host, so the pool limit is effectively the per-host limit
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=max(1, self.max_connections // 2)
+        )
+
+        async with httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            headers=headers,
+            timeout=httpx.Timeout(30.0),
+            limits=limits
+        ) as client:
+            return await asyncio.gather(
+                *(
+                    self.download_image_async(
+                        client, semaphore, image_url, product_name, timestamp, image_folder, unique_id
+                    )
+                    for image_url, product_name, unique_id in jobs
+                ),
+                return_exceptions=True
+            )
+
+    async def download_image_async(self, client, semaphore, image_url, product_name, timestamp, image_folder, unique_id, retries=3):
         """Async image download with high-resolution preference"""
         if not image_url or image_url == "N/A":
             return "N/A"
@@ -452,50 +545,69 @@ class GoldmarkScraper:
 
         high_res_url = self.modify_image_url(image_url)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Try high-resolution first
-            for attempt in range(retries):
-                try:
-                    response = await client.get(high_res_url)
+        # Try high-resolution first
+        for attempt in range(retries):
+            retry_after = None
+            try:
+                async with semaphore, client.stream("GET", high_res_url) as response:
                     response.raise_for_status()
                     
-                    # Verify it's actually an image
-                    content_type = response.headers.get('content-type', '')
-                    if not content_type.startswith('image/'):
-                        logger.warning(f"URL {high_res_url} returned non-image content type: {content_type}")
-                        continue
-                        
-                    with open(image_full_path, "wb") as f:
-                        f.write(response.content)
-                    
-                    logger.info(f"Successfully downloaded high-res image for {product_name}")
-                    return image_full_path
+                    # Verify it's actually an image from the headers, before any of the body is read;
+                    # the same URL will answer the same way, so go straight to the fallback
+                    rejection = reject_image_response(response)
+                    if rejection:
+                        logger.warning(f"URL {high_res_url} returned {rejection}")
+                        break
                     
-                except httpx.RequestError as e:
-                    logger.warning(f"Retry {attempt + 1}/{retries} - High-res failed for {product_name}: {e}")
-                    if attempt < retries - 1:
-                        await asyncio.sleep(2)  # Wait before retry
+                    # Stream to disk without blocking the event loop, giving up past the size cap
+                    rejection = await stream_image_to_file(response, image_full_path, IMAGE_CHUNK_SIZE)
+                    if rejection:
+                        logger.warning(f"URL {high_res_url} returned {rejection}")
+                        break
+                
+                logger.info(f"Successfully downloaded high-res image for {product_name}")
+                return image_full_path
+                
+            except httpx.HTTPStatusError as e:
+                # Only overload/transient statuses are retried; anything else fails the product as before
+                if e.response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise
+                retry_after = e.response.headers.get('retry-after')
+                logger.warning(f"Retry {attempt + 1}/{retries} - High-res failed for {product_name}: HTTP {e.response.status_code}")
+            except httpx.RequestError as e:
+                logger.warning(f"Retry {attempt + 1}/{retries} - High-res failed for {product_name}: {e}")
             
-            # Fallback to original image
-            try:
-                response = await client.get(image_url)
+            if attempt < retries - 1:
+                await asyncio.sleep(self._retry_delay(attempt, retry_after))
+        
+        # Fallback to original image
+        try:
+            async with semaphore, client.stream("GET", image_url) as response:
                 response.raise_for_status()
                 
                 # Verify it's actually an image
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    logger.warning(f"Original URL {image_url} returned non-image content type: {content_type}")
+                rejection = reject_image_response(response)
+                if rejection:
+                    logger.warning(f"Original URL {image_url} returned {rejection}")
                     return "N/A"
-                    
-                with open(image_full_path, "wb") as f:
-                    f.write(response.content)
                 
-                logger.info(f"Successfully downloaded original image for {product_name}")
-                return image_full_path
-                
-            except httpx.RequestError as e:
-                logger.error(f"Fallback failed for {product_name}: {e}")
-                return "N/A"
+                rejection = await stream_image_to_file(response, image_full_path, IMAGE_CHUNK_SIZE)
+                if rejection:
+                    logger.warning(f"Original URL {image_url} returned {rejection}")
+                    return "N/A"
+            
+            logger.info(f"Successfully downloaded original image for {product_name}")
+            return image_full_path
+            
+        except httpx.RequestError as e:
+            logger.error(f"Fallback failed for {product_name}: {e}")
+            return "N/A"
+    
+    def _retry_delay(self, attempt: int, retry_after: str = None) -> float:
+        """Seconds to wait before the next attempt: the server's Retry-After if given, else exponential backoff with jitter"""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_DELAY)
+        return min(2 ** attempt, MAX_RETRY_DELAY) + random.uniform(0, 1)
     
     def extract_price_value(self, text: str) -> str:
         """Extract price from text"""
@@ -503,24 +615,12 @@ class GoldmarkScraper:
             return "N/A"
         
         # Look for price patterns
-        price_patterns = [
-            r'\$[\d,]+\.?\d*',  # Standard price format
-            r'\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?',  # Formatted price
-        ]
-        
-        for pattern in price_patterns:
-            price_match = re.search(pattern, text)
-            if price_match:
-                return price_match.group(0)
-        
-        return "N/A"
+        price_match = _PRICE_RE.search(text)
+        return price_match.group(0) if price_match else "N/A"
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
             return ""
-        # Remove extra whitespace and normalize
-        text = ' '.join(text.split()).strip()
-        # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        return text
\ No newline at end of file
+        # Collapse every whitespace run to a single space (split() already trims the ends)
+        return ' '.join(text.split())
\ No newline at end of file
@@ -4,14 +4,15 @@ import os
 import uuid
 import logging
 from datetime import datetime
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 import re
 from typing import Dict, Any, List
-import requests
 import httpx
 from urllib.parse import urlparse
-from openpyxl import Workbook
-from database.db_inseartin import insert_into_db, update_product_count
+from scrapers.xlsx_writer import SegmentedXlsxWriter
+from scrapers.scrape_utils import node_matches, link_downloaded_image, reject_image_response, stream_image_to_file
+from database.db_inseartin import insert_into_db
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +21,87 @@ logger = logging.getLogger(__name__)
 IMAGE_SAVE_PATH = os.getenv("IMAGE_SAVE_PATH")
 EXCEL_DATA_PATH = os.getenv("EXCEL_DATA_PATH")
 
+# Bytes read per base64 chunk (multiple of 3)
+BASE64_CHUNK_SIZE = 57 * 1024
+
+# Images are streamed to disk in chunks of this size instead of being buffered whole
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# HTTP/2 lets all image requests to cdn.shopify.com share one multiplexed connection (needs httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# products.json paging: Shopify's maximum page size, pages requested per concurrent batch,
+# and a hard stop in case a store keeps returning full pages
+SHOPIFY_PAGE_LIMIT = 250
+SHOPIFY_PAGE_BATCH = 8
+SHOPIFY_MAX_PAGES = 100
+
+# products.json attempts per page when the store throttles (429) or errors (5xx), and the
+# longest wait honoured from a Retry-After header
+SHOPIFY_PAGE_RETRIES = 3
+SHOPIFY_MAX_RETRY_DELAY = 30
+
+# Hoskings product tile selectors (Shopify store), in priority order, and as one
+# union so the tree is walked once
+_PRODUCT_SELECTORS = [
+    'div.w-full.cursor-pointer.relative',  # Main product container
+    '.infiniteHits div.w-full',  # Products in infinite hits
+    'div[class*="cursor-pointer"]',  # Any cursor pointer divs
+    '.grid > div'  # Direct children of grid
+]
+_PRODUCT_SELECTOR_UNION = ', '.join(_PRODUCT_SELECTORS)
+
+# Product field selectors, built once rather than per tile; Lexbor has no compiled
+# selector object, so these are the strings handed to css()/css_first()
+_NAME_SELECTORS = (
+    'p.font-normal.text-text-subdued.text-label',  # Product description
+    'a p.font-normal',  # Paragraph in link
+    '.text-label'  # Any label text
+)
+# Hoskings sale price may use multiple possible classes
+_SALE_PRICE_SELECTOR = (
+    'span.text-text-sale, span.text-promo-green, span.text-promo-green.pr-1, span.text-text-sale.pr-1'
+)
+_ORIGINAL_PRICE_SELECTOR = 'span.line-through.text-text-disabled'  # Original price (line-through)
+_PRICE_CONTAINER_SELECTOR = 'div.text-label.text-text-subdued.font-bold.mt-1'
+_IMAGE_SELECTOR = 'img[src*="cdn.shopify.com"]'  # Hoskings uses Shopify CDN images
+_LINK_SELECTORS = (
+    'a[href*="/products/"]',  # Product links
+    'a[href^="/products"]',  # Relative product links
+    '.relative a'  # Links in relative container
+)
+_BADGE_SELECTOR = 'div.absolute.z-10.bg-brand-polar-white'
+
+# Precompiled patterns used in the per-product hot loop
+# Diamond weight formats in priority order ("TDW 1CT", "1CT TW", "1 carat", "1 ct"); the outer
+# group name of a match gives its priority and <name>_weight holds the weight
+_DIAMOND_WEIGHT_RE = re.compile(
+    r"(?P<tdw>TDW\s*(?P<tdw_weight>\d+(?:\.\d+)?)\s*CT)"
+    r"|(?P<ct_tw>(?P<ct_tw_weight>\d+(?:\.\d+)?)\s*CT\s+TW)"
+    r"|(?P<carat>(?P<carat_weight>\d+(?:\.\d+)?)\s*carat)"
+    r"|(?P<ct>(?P<ct_weight>\d+(?:\.\d+)?)\s*ct)",
+    re.IGNORECASE
+)
+_DIAMOND_WEIGHT_PRIORITY = {'tdw': 0, 'ct_tw': 1, 'carat': 2, 'ct': 3}
+
+# Gold type formats like "14ct Rose Gold", in priority order; match.lastindex is the
+# priority. The "9ct|14ct|18ct" pattern was already covered by the \d{1,2}ct one
+_GOLD_TYPE_RE = re.compile(
+    r"(?P<karat>\b\d{1,2}ct\s+(?:rose|yellow|white)\s+gold\b)"
+    r"|(?P<color>\b(?:rose|yellow|white)\s+gold\b)"
+    r"|(?P<silver>\bsterling\s+silver\b)"
+    r"|(?P<platinum>\bplatinum\b)",
+    re.IGNORECASE
+)
+
+# Dollar price format; also covers the stricter formatted-price pattern
+_PRICE_RE = re.compile(r'\$\s*[\d,]+\.?\d*')
+_WS_RE = re.compile(r'\s+')
+
 
 class HoskingsScraper:
     """Parser for Hoskings.com.au Shopify store with database and Excel functionality"""
@@ -27,6 +109,8 @@ class HoskingsScraper:
     def __init__(self, excel_data_path=EXCEL_DATA_PATH, image_save_path=IMAGE_SAVE_PATH):
         self.excel_data_path = excel_data_path
         self.image_save_path = image_save_path
+        # Image download client, open only for the duration of a scrape session
+        self._client = None
         self.setup_directories()
     
     def setup_directories(self):
@@ -34,7 +118,8 @@ class HoskingsScraper:
         os.makedirs(self.excel_data_path, exist_ok=True)
         os.makedirs(self.image_save_path, exist_ok=True)
     
-    def parse_and_save_products(self, products_data: List[Dict], page_title: str, page_url: str = "") -> Dict[str, Any]:
+    def parse_and_save_products(self, products_data: List[Dict], page_title: str, page_url: str = "",
+                                include_base64: bool = True, segment_size: int = 250_000) -> Dict[str, Any]:
         """
         Main method to parse products and save to database/Excel
         Returns: JSON response compatible with your requirements
@@ -52,41 +137,50 @@ class HoskingsScraper:
             
             # Generate unique session ID and timestamp
             session_id = str(uuid.uuid4())
+            # Product IDs share one random prefix and end in the product index as the 12-hex-digit
+            # last group, so they stay unique, UUID-shaped strings without a uuid4() per product
+            id_prefix = str(uuid.uuid4())[:24]
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             current_date = datetime.now().date()
             current_time = datetime.now().time()
             
+            # These never change within a session, so format them once
+            date_str = current_date.strftime('%Y-%m-%d')
+            time_str = current_time.strftime('%H:%M:%S')
+            
             # Create image folder for this session
             image_folder = os.path.join(self.image_save_path, f"hoskings_{timestamp}")
             os.makedirs(image_folder, exist_ok=True)
             
-            # Create Excel file
-            excel_filename = f"hoskings_scraped_products_{timestamp}.xlsx"
+            # Create Excel file; very large scrapes continue in _2.xlsx, _3.xlsx, ...
+            excel_stem = f"hoskings_scraped_products_{timestamp}"
+            excel_filename = f"{excel_stem}.xlsx"
             excel_path = os.path.join(self.excel_data_path, excel_filename)
             
             # Process products
             database_records = []
             successful_downloads = 0
             
-            # Create Excel workbook
-            wb = Workbook()
-            sheet = wb.active
-            sheet.title = "Hoskings Products"
-            
-            # Add headers
-            headers = [
+            # Excel header row, repeated at the top of every segment
+            headers = (
                 'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
                 'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
                 'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
                 'Session ID', 'Page URL'
-            ]
-            sheet.append(headers)
+            )
             
-            # Process each product
-            for i, product_html in enumerate(individual_products):
+            # Parse every product first so the image downloads can run concurrently
+            parsed_products = []
+            for i, product_node in enumerate(individual_products):
                 try:
+                    # Tiles without a Shopify CDN image can never yield an image URL; skip them before parsing.
+                    # This is the same lookup _extract_image does, so the tile is not serialized to test it
+                    if product_node.css_first(_IMAGE_SELECTOR) is None:
+                        print(f"Skipping product {i} due to missing data: no Shopify CDN image")
+                        continue
+                    
                     # Parse product data
-                    parsed_data = self.parse_product(product_html)
+                    parsed_data = self.parse_product(product_node)
                     
                     # Skip if essential data is missing
                     if (parsed_data.get('product_name') == "N/A" or 
@@ -95,87 +189,107 @@ class HoskingsScraper:
                         continue
                     
                     # Generate unique ID
-                    unique_id = str(uuid.uuid4())
+                    unique_id = f"{id_prefix}{i:012x}"
                     product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
-                    
-                    # Download image - use async method
-                    image_url = parsed_data.get('image_url')
-                    image_path = asyncio.run(self.download_image_async(
-                        image_url, product_name, timestamp, image_folder, unique_id
-                    ))
-                    
-                    if image_path != "N/A":
-                        successful_downloads += 1
-                    
-                    # Prepare additional info
-                    badges = parsed_data.get('badges', [])
-                    promotions = parsed_data.get('promotions', '')
-                    additional_info_parts = []
-                    
-                    if badges and badges != ["N/A"]:
-                        additional_info_parts.extend(badges)
-                    if promotions and promotions != "N/A":
-                        additional_info_parts.append(promotions)
-                    
-                    additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
-                    
-                    # Create database record
-                    db_record = {
-                        'unique_id': unique_id,
-                        'current_date': current_date,
-                        'page_title': page_title,
-                        'product_name': product_name,
-                        'image_path': image_path,
-                        'price': parsed_data.get('price'),
-                        'diamond_weight': parsed_data.get('diamond_weight'),
-                        'gold_type': parsed_data.get('gold_type'),
-                        'additional_info': additional_info,
-                    }
-                    
-                    database_records.append(db_record)
-                    
-                    # Add to Excel
-                    sheet.append([
-                        unique_id,
-                        current_date.strftime('%Y-%m-%d'),
-                        page_title,
-                        product_name,
-                        image_path,
-                        parsed_data.get('gold_type', 'N/A'),
-                        parsed_data.get('price', 'N/A'),
-                        parsed_data.get('diamond_weight', 'N/A'),
-                        additional_info,
-                        current_time.strftime('%H:%M:%S'),
-                        image_url,
-                        parsed_data.get('link', 'N/A'),
-                        session_id,
-                        page_url
-                    ])
-                    
-                    print(f"Processed product {i+1}: {product_name}")
+                    parsed_products.append((i, unique_id, product_name, parsed_data))
                     
                 except Exception as e:
                     print(f"Error processing product {i}: {e}")
                     continue
             
-            # Save Excel file
-            wb.save(excel_path)
-            print(f"Excel file saved: {excel_path}")
+            # Download all images from one event loop over a shared client
+            image_jobs = [
+                (parsed_data.get('image_url'), product_name, unique_id)
+                for _, unique_id, product_name, parsed_data in parsed_products
+            ]
+            image_paths = asyncio.run(self.download_images(image_jobs, timestamp, image_folder))
             
-            # Insert data into the database and update product count
-            if database_records:
-                insert_into_db(database_records)
-                update_product_count(len(database_records))
+            # Create Excel workbook (rows are streamed straight into the xlsx package); if anything
+            # below fails, leaving the block deletes the unfinished segment instead of keeping it truncated
+            with SegmentedXlsxWriter(
+                os.path.join(self.excel_data_path, excel_stem), headers, segment_size, "Hoskings Products"
+            ) as sheet:
+                # Process each product
+                for (i, unique_id, product_name, parsed_data), image_path in zip(parsed_products, image_paths):
+                    try:
+                        # A failed download drops the product, as the per-product loop did
+                        if isinstance(image_path, Exception):
+                            raise image_path
+                        
+                        image_url = parsed_data.get('image_url')
+                        
+                        if image_path != "N/A":
+                            successful_downloads += 1
+                        
+                        # Prepare additional info
+                        badges = parsed_data.get('badges', [])
+                        promotions = parsed_data.get('promotions', '')
+                        additional_info_parts = []
+                        
+                        if badges and badges != ["N/A"]:
+                            additional_info_parts.extend(badges)
+                        if promotions and promotions != "N/A":
+                            additional_info_parts.append(promotions)
+                        
+                        additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
+                        
+                        # Create database record
+                        db_record = {
+                            'unique_id': unique_id,
+                            'current_date': current_date,
+                            'page_title': page_title,
+                            'product_name': product_name,
+                            'image_path': image_path,
+                            'price': parsed_data.get('price'),
+                            'diamond_weight': parsed_data.get('diamond_weight'),
+                            'gold_type': parsed_data.get('gold_type'),
+                            'additional_info': additional_info,
+                        }
+                        
+                        database_records.append(db_record)
+                        
+                        # Add to Excel
+                        sheet.append((
+                            unique_id,
+                            date_str,
+                            page_title,
+                            product_name,
+                            image_path,
+                            parsed_data.get('gold_type', 'N/A'),
+                            parsed_data.get('price', 'N/A'),
+                            parsed_data.get('diamond_weight', 'N/A'),
+                            additional_info,
+                            time_str,
+                            image_url,
+                            parsed_data.get('link', 'N/A'),
+                            session_id,
+                            page_url
+                        ))
+                        
+                        print(f"Processed product {i+1}: {product_name}")
+                        
+                    except Exception as e:
+                        print(f"Error processing product {i}: {e}")
+                        continue
+                
+                # Save Excel file while the records go to the database; the two are independent
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    excel_future = executor.submit(sheet.close)
+                    db_future = executor.submit(self.save_to_database, database_records)
+                    excel_future.result()
+                    print(f"Excel file saved: {', '.join(sheet.paths)}")
+                    db_future.result()
             
-            # Encode Excel file to base64
-            with open(excel_path, "rb") as file:
-                base64_file = base64.b64encode(file.read()).decode("utf-8")
+            # Encode Excel file to base64 (callers that only need file_path can skip this);
+            # with several segments this is the first one, as excel_file/file_path are
+            base64_file = self.encode_file_base64(excel_path) if include_base64 else None
             
             # Return JSON response
             return {
                 'message': f'Successfully processed {len(database_records)} products',
                 'session_id': session_id,
                 'excel_file': excel_filename,
+                'excel_files': [os.path.basename(path) for path in sheet.paths],
                 'total_processed': len(database_records),
                 'images_downloaded': successful_downloads,
                 'failed': len(individual_products) - len(database_records),
@@ -191,6 +305,14 @@ class HoskingsScraper:
                 'message': 'Failed to process products'
             }
 
+    def save_to_database(self, database_records: List[Dict]):
+        """Insert data into the database and update product count; raises if not every record was stored"""
+        if database_records:
+            # insert_into_db logs and swallows database errors, so check its count
+            inserted = insert_into_db(database_records, update_count=True)
+            if inserted != len(database_records):
+                raise RuntimeError(f"Database insert stored {inserted} of {len(database_records)} records")
+
     def scrape_shopify_json(self, base_url: str) -> List[Dict]:
         """
         Shopify-specific scraping using the JSON API endpoint
@@ -201,11 +323,7 @@ class HoskingsScraper:
             json_url = f"{base_url.rstrip('/')}/products.json"
             print(f"Fetching Shopify data from: {json_url}")
             
-            response = requests.get(json_url, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            products = data.get('products', [])
+            products = asyncio.run(self.fetch_shopify_products(json_url))
             
             print(f"Found {len(products)} products via Shopify API")
             
@@ -236,15 +354,59 @@ class HoskingsScraper:
             print(f"Error scraping Shopify JSON: {e}")
             return []
     
-    def parse_product(self, product_html: str) -> Dict[str, Any]:
-        """Parse individual product HTML from Hoskings Shopify store"""
-        try:
-            soup = BeautifulSoup(product_html, 'html.parser')
+    async def fetch_shopify_products(self, json_url: str) -> List[Dict]:
+        """
+        Fetch every page of products.json, requesting the pages after the first in concurrent batches.
+        If a later page cannot be fetched, the products collected up to then are returned.
+        """
+        async with httpx.AsyncClient(
+            http2=HTTP2_ENABLED, timeout=httpx.Timeout(30.0), follow_redirects=True
+        ) as client:
+            async def fetch_page(page):
+                for attempt in range(SHOPIFY_PAGE_RETRIES):
+                    response = await client.get(json_url, params={'limit': SHOPIFY_PAGE_LIMIT, 'page': page})
+                    # Throttled or a server error: back off (or wait as long as the store asks) and retry
+                    if (response.status_code == 429 or response.status_code >= 500) and attempt < SHOPIFY_PAGE_RETRIES - 1:
+                        retry_after = response.headers.get('retry-after', '')
+                        delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+                        logger.warning(f"products.json page {page} returned {response.status_code}, retrying")
+                        await asyncio.sleep(min(delay, SHOPIFY_MAX_RETRY_DELAY))
+                        continue
+                    response.raise_for_status()
+                    return response.json().get('products', [])
             
-            product_name = self._extract_product_name(soup)
-            price = self._extract_price(soup)
-            image_url = self._extract_image(soup)
-            link = self._extract_link(soup)
+            # A single-page catalogue needs only the one request
+            products = await fetch_page(1)
+            if len(products) < SHOPIFY_PAGE_LIMIT:
+                return products
+            
+            page = 2
+            while page <= SHOPIFY_MAX_PAGES:
+                last_page = min(page + SHOPIFY_PAGE_BATCH, SHOPIFY_MAX_PAGES + 1)
+                batch = await asyncio.gather(
+                    *(fetch_page(p) for p in range(page, last_page)),
+                    return_exceptions=True
+                )
+                for batch_page, page_products in zip(range(page, last_page), batch):
+                    # Keep what has been fetched so far rather than failing the whole scrape
+                    if isinstance(page_products, Exception):
+                        logger.error(f"Stopping at products.json page {batch_page}: {page_products}")
+                        return products
+                    products.extend(page_products)
+                    # A short (or empty) page is the last one
+                    if len(page_products) < SHOPIFY_PAGE_LIMIT:
+                        return products
+                page = last_page
+            
+            return products
+    
+    def parse_product(self, node: LexborNode) -> Dict[str, Any]:
+        """Parse an individual product tile from the Hoskings Shopify store page tree"""
+        try:
+            product_name = self._extract_product_name(node)
+            price = self._extract_price(node)
+            image_url = self._extract_image(node)
+            link = self._extract_link(node)
             
             # Skip if essential data is missing
             if product_name == "N/A" or image_url == "N/A":
@@ -266,8 +428,8 @@ class HoskingsScraper:
                 'link': link,
                 'diamond_weight': self._extract_diamond_weight(product_name),
                 'gold_type': self._extract_gold_type(product_name),
-                'badges': self._extract_badges(soup),
-                'promotions': self._extract_promotions(soup)
+                'badges': self._extract_badges(node),
+                'promotions': self._extract_promotions(node)
             }
         except Exception as e:
             logger.error(f"Error parsing product: {e}")
@@ -282,63 +444,57 @@ class HoskingsScraper:
                 'promotions': "N/A"
             }
     
-    def extract_individual_products_from_html(self, html_content: str) -> List[str]:
-        """Extract individual product HTML blocks from Hoskings HTML"""
+    def extract_individual_products_from_html(self, html_content: str) -> List[LexborNode]:
+        """Extract individual product tiles from Hoskings HTML (parsed once with the Lexbor C parser)"""
         if not html_content:
             return []
         
-        soup = BeautifulSoup(html_content, 'html.parser')
+        tree = LexborHTMLParser(html_content)
         
-        # Hoskings specific product selectors (Shopify store)
-        product_selectors = [
-            'div.w-full.cursor-pointer.relative',  # Main product container
-            '.infiniteHits div.w-full',  # Products in infinite hits
-            'div[class*="cursor-pointer"]',  # Any cursor pointer divs
-            '.grid > div'  # Direct children of grid
-        ]
+        # One pass over the tree with the union selector; Lexbor yields a node once per
+        # sub-selector it matches, so dedupe while keeping document order
+        seen = set()
+        product_tiles = []
+        for tile in tree.css(_PRODUCT_SELECTOR_UNION):
+            if tile.mem_id not in seen:
+                seen.add(tile.mem_id)
+                product_tiles.append(tile)
         
+        # Keep the matches of the first selector (in priority order) that found products,
+        # so nested containers are not doubled
         individual_products = []
-        
-        for selector in product_selectors:
-            product_tiles = soup.select(selector)
-            for tile in product_tiles:
-                individual_products.append(str(tile))
+        for selector in _PRODUCT_SELECTORS:
+            individual_products = [tile for tile in product_tiles if node_matches(tile, selector)]
             if individual_products:
                 break  # Stop if we found products with this selector
         
         print(f"Found {len(individual_products)} product tiles in Hoskings HTML")
         return individual_products
     
-    def _extract_product_name(self, soup) -> str:
+    def _extract_product_name(self, node) -> str:
         """Extract product name from Hoskings product tile"""
         # Try multiple selectors for product name
-        name_selectors = [
-            'p.font-normal.text-text-subdued.text-label',  # Product description
-            'a p.font-normal',  # Paragraph in link
-            '.text-label',  # Any label text
-            'p:contains("ct")'  # Paragraph containing "ct" (carat)
-        ]
+        for selector in _NAME_SELECTORS:
+            name_element = node.css_first(selector)
+            if name_element and name_element.text(strip=True):
+                return self.clean_text(name_element.text())
         
-        for selector in name_selectors:
-            name_element = soup.select_one(selector)
-            if name_element and name_element.get_text(strip=True):
-                return self.clean_text(name_element.get_text())
+        # Paragraph containing "ct" (carat); :contains() is not CSS, so check the text here
+        for paragraph in node.css('p'):
+            paragraph_text = paragraph.text()
+            if "ct" in paragraph_text:
+                return self.clean_text(paragraph_text)
         
         return "N/A"
     
-    def _extract_price(self, soup) -> str:
+    def _extract_price(self, node) -> str:
         """Extract price information from Hoskings product"""
         try:
-            # Hoskings sale price may use multiple possible classes
-            sale_price_element = soup.select_one(
-                'span.text-text-sale, span.text-promo-green, span.text-promo-green.pr-1, span.text-text-sale.pr-1'
-            )
-            
-            # Original price (line-through)
-            original_price_element = soup.select_one('span.line-through.text-text-disabled')
+            sale_price_element = node.css_first(_SALE_PRICE_SELECTOR)
+            original_price_element = node.css_first(_ORIGINAL_PRICE_SELECTOR)
 
-            sale_price = sale_price_element.get_text(strip=True) if sale_price_element else ""
-            original_price = original_price_element.get_text(strip=True) if original_price_element else ""
+            sale_price = sale_price_element.text(strip=True) if sale_price_element else ""
+            original_price = original_price_element.text(strip=True) if original_price_element else ""
 
             if sale_price and original_price:
                 return f"{sale_price} | {original_price}"
@@ -348,9 +504,9 @@ class HoskingsScraper:
                 return original_price
 
             # fallback
-            price_container = soup.select_one('div.text-label.text-text-subdued.font-bold.mt-1')
+            price_container = node.css_first(_PRICE_CONTAINER_SELECTOR)
             if price_container:
-                price_text = price_container.get_text(strip=True)
+                price_text = price_container.text(strip=True)
                 return self.extract_price_value(price_text)
 
             return "N/A"
@@ -359,13 +515,13 @@ class HoskingsScraper:
             logger.warning(f"Error extracting price: {e}")
             return "N/A"
 
-    def _extract_image(self, soup) -> str:
+    def _extract_image(self, node) -> str:
         """Extract product image URL from Hoskings product"""
         try:
-            # Hoskings uses Shopify CDN images
-            img_element = soup.select_one('img[src*="cdn.shopify.com"]')
+            img_element = node.css_first(_IMAGE_SELECTOR)
             if img_element:
-                image_url = img_element.get('src') or img_element.get('data-src')
+                attrs = img_element.attributes
+                image_url = attrs.get('src') or attrs.get('data-src')
                 if image_url:
                     return self._normalize_image_url(image_url)
             
@@ -374,19 +530,12 @@ class HoskingsScraper:
             logger.warning(f"Error extracting image: {e}")
             return "N/A"
     
-    def _extract_link(self, soup) -> str:
+    def _extract_link(self, node) -> str:
         """Extract product link from Hoskings product"""
-        # Link selectors for Hoskings
-        link_selectors = [
-            'a[href*="/products/"]',  # Product links
-            'a[href^="/products"]',  # Relative product links
-            '.relative a'  # Links in relative container
-        ]
-        
-        for selector in link_selectors:
-            link_element = soup.select_one(selector)
-            if link_element and link_element.get('href'):
-                href = link_element.get('href')
+        for selector in _LINK_SELECTORS:
+            link_element = node.css_first(selector)
+            href = link_element.attributes.get('href') if link_element else None
+            if href:
                 return self._normalize_link_url(href)
         
         return "N/A"
@@ -396,19 +545,20 @@ class HoskingsScraper:
         if not product_name or product_name == "N/A":
             return "N/A"
         
-        # Hoskings uses formats like "TDW 1CT", "TDW 2CT"
-        diamond_patterns = [
-            r"TDW\s*(\d+(?:\.\d+)?)\s*CT",  # TDW 1CT, TDW 2CT
-            r"(\d+(?:\.\d+)?)\s*CT\s+TW",  # 1CT TW
-            r"(\d+(?:\.\d+)?)\s*carat",  # 1 carat
-            r"(\d+(?:\.\d+)?)\s*ct"  # 1 ct
-        ]
+        # Hoskings uses formats like "TDW 1CT", "TDW 2CT"; single scan, keeping the
+        # highest-priority format found, like trying each pattern in turn
+        best_match = None
+        best_priority = len(_DIAMOND_WEIGHT_PRIORITY)
+        for diamond_match in _DIAMOND_WEIGHT_RE.finditer(product_name):
+            priority = _DIAMOND_WEIGHT_PRIORITY[diamond_match.lastgroup]
+            if priority < best_priority:
+                best_match, best_priority = diamond_match, priority
+                if priority == 0:
+                    break
         
-        for pattern in diamond_patterns:
-            diamond_match = re.search(pattern, product_name, re.IGNORECASE)
-            if diamond_match:
-                weight = diamond_match.group(1)
-                return f"{weight} CT"
+        if best_match:
+            weight = best_match.group(f"{best_match.lastgroup}_weight")
+            return f"{weight} CT"
         
         return "N/A"
     
@@ -417,31 +567,26 @@ class HoskingsScraper:
         if not product_name or product_name == "N/A":
             return "N/A"
         
-        # Hoskings uses formats like "14ct Rose Gold", "14ct Yellow Gold"
-        gold_patterns = [
-            r"\b\d{1,2}ct\s+(?:rose|yellow|white)\s+gold\b",
-            r"\b(?:9ct|14ct|18ct)\s+(?:rose|yellow|white)\s+gold\b",
-            r"\b(?:rose|yellow|white)\s+gold\b",
-            r"\bsterling\s+silver\b",
-            r"\bplatinum\b"
-        ]
-        
-        for pattern in gold_patterns:
-            gold_type_match = re.search(pattern, product_name, re.IGNORECASE)
-            if gold_type_match:
-                return gold_type_match.group().upper()
+        # Hoskings uses formats like "14ct Rose Gold", "14ct Yellow Gold"; single scan,
+        # keeping the highest-priority pattern found
+        best_match = None
+        for gold_type_match in _GOLD_TYPE_RE.finditer(product_name):
+            if best_match is None or gold_type_match.lastindex < best_match.lastindex:
+                best_match = gold_type_match
+                if best_match.lastindex == 1:
+                    break
         
-        return "N/A"
+        return best_match.group().upper() if best_match else "N/A"
     
-    def _extract_badges(self, soup) -> list:
+    def _extract_badges(self, node) -> list:
         """Extract badge information from Hoskings product"""
         badges = []
         
         try:
             # Extract sale badges
-            badge_elements = soup.select('div.absolute.z-10.bg-brand-polar-white')
+            badge_elements = node.css(_BADGE_SELECTOR)
             for badge_element in badge_elements:
-                badge_text = self.clean_text(badge_element.get_text())
+                badge_text = self.clean_text(badge_element.text())
                 if badge_text and badge_text.upper() == "SALE":
                     badges.append("SALE")
         except Exception as e:
@@ -449,12 +594,12 @@ class HoskingsScraper:
         
         return badges if badges else ["N/A"]
     
-    def _extract_promotions(self, soup) -> str:
+    def _extract_promotions(self, node) -> str:
         """Extract promotion text from Hoskings product"""
         # For Hoskings, the original price serves as promotion info
-        original_price_element = soup.select_one('span.line-through.text-text-disabled')
+        original_price_element = node.css_first(_ORIGINAL_PRICE_SELECTOR)
         if original_price_element:
-            original_price = original_price_element.get_text(strip=True)
+            original_price = original_price_element.text(strip=True)
             return f"Was {original_price}" if original_price else "N/A"
         
         return "N/A"
@@ -483,6 +628,15 @@ class HoskingsScraper:
             return f"https://hoskings.com.au{url}"
         return url
 
+    def encode_file_base64(self, file_path: str) -> str:
+        """Base64-encode a file in chunks so the raw file is never held in memory as a whole"""
+        encoded_parts = []
+        with open(file_path, "rb") as file:
+            # Chunk size is a multiple of 3, so chunks encode without padding and concatenate cleanly
+            for chunk in iter(lambda: file.read(BASE64_CHUNK_SIZE), b""):
+                encoded_parts.append(base64.b64encode(chunk).decode("ascii"))
+        return "".join(encoded_parts)
+
     def modify_image_url(self, image_url: str) -> str:
         """Modify the image URL to request higher resolution for Shopify CDN."""
         if not image_url or image_url == "N/A":
@@ -498,7 +652,53 @@ class HoskingsScraper:
         
         return image_url
 
-    async def download_image_async(self, image_url, product_name, timestamp, image_folder, unique_id, retries=3):
+    async def download_images(self, jobs: List[tuple], timestamp: str, image_folder: str, concurrency: int = 32) -> List[Any]:
+        """
+        Download (image_url, product_name, unique_id) jobs concurrently over one shared client
+        Returns: image path, "N/A" or the raised exception for each job, in job order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        # One download per distinct image URL; later jobs for the same URL wait on it
+        downloads_in_flight: Dict[str, asyncio.Future] = {}
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            headers={
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                "Accept": "image/*,*/*;q=0.8",
+            },
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        )
+
+        try:
+            async def bounded_download(image_url, product_name, unique_id):
+                async with semaphore:
+                    return await self.download_image_async(
+                        self._client, image_url, product_name, timestamp, image_folder, unique_id
+                    )
+
+            async def shared_download(image_url, product_name, unique_id):
+                download = downloads_in_flight.get(image_url)
+                if download is None:
+                    download = asyncio.ensure_future(bounded_download(image_url, product_name, unique_id))
+                    downloads_in_flight[image_url] = download
+                    return await download
+                
+                # Repeated image: wait outside the semaphore, then give this product its own file
+                source_path = await download
+                if source_path == "N/A":
+                    return "N/A"
+                return link_downloaded_image(source_path, image_folder, unique_id, timestamp)
+
+            return await asyncio.gather(
+                *(shared_download(*job) for job in jobs),
+                return_exceptions=True
+            )
+        finally:
+            await self._client.aclose()
+            self._client = None
+
+    async def download_image_async(self, client, image_url, product_name, timestamp, image_folder, unique_id, retries=3):
         """Async image download with high-resolution preference"""
         if not image_url or image_url == "N/A":
             return "N/A"
@@ -508,50 +708,55 @@ class HoskingsScraper:
 
         high_res_url = self.modify_image_url(image_url)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Try high-resolution first
-            for attempt in range(retries):
-                try:
-                    response = await client.get(high_res_url)
+        # Try high-resolution first
+        for attempt in range(retries):
+            try:
+                async with client.stream("GET", high_res_url) as response:
                     response.raise_for_status()
                     
-                    # Verify it's actually an image
-                    content_type = response.headers.get('content-type', '')
-                    if not content_type.startswith('image/'):
-                        logger.warning(f"URL {high_res_url} returned non-image content type: {content_type}")
-                        continue
-                        
-                    with open(image_full_path, "wb") as f:
-                        f.write(response.content)
-                    
-                    logger.info(f"Successfully downloaded high-res image for {product_name}")
-                    return image_full_path
+                    # Verify it's actually an image from the headers, before any of the body is read;
+                    # the same URL will answer the same way, so go straight to the fallback
+                    rejection = reject_image_response(response)
+                    if rejection:
+                        logger.warning(f"URL {high_res_url} returned {rejection}")
+                        break
                     
-                except httpx.RequestError as e:
-                    logger.warning(f"Retry {attempt + 1}/{retries} - High-res failed for {product_name}: {e}")
-                    if attempt < retries - 1:
-                        await asyncio.sleep(2)  # Wait before retry
-            
-            # Fallback to original image
-            try:
-                response = await client.get(image_url)
+                    # Stream to disk without blocking the event loop, giving up past the size cap
+                    rejection = await stream_image_to_file(response, image_full_path, IMAGE_CHUNK_SIZE)
+                    if rejection:
+                        logger.warning(f"URL {high_res_url} returned {rejection}")
+                        break
+                
+                logger.info(f"Successfully downloaded high-res image for {product_name}")
+                return image_full_path
+                
+            except httpx.RequestError as e:
+                logger.warning(f"Retry {attempt + 1}/{retries} - High-res failed for {product_name}: {e}")
+                if attempt < retries - 1:
+                    await asyncio.sleep(2)  # Wait before retry
+        
+        # Fallback to original image
+        try:
+            async with client.stream("GET", image_url) as response:
                 response.raise_for_status()
                 
                 # Verify it's actually an image
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    logger.warning(f"Original URL {image_url} returned non-image content type: {content_type}")
+                rejection = reject_image_response(response)
+                if rejection:
+                    logger.warning(f"Original URL {image_url} returned {rejection}")
                     return "N/A"
-                    
-                with open(image_full_path, "wb") as f:
-                    f.write(response.content)
-                
-                logger.info(f"Successfully downloaded original image for {product_name}")
-                return image_full_path
                 
-            except httpx.RequestError as e:
-                logger.error(f"Fallback failed for {product_name}: {e}")
-                return "N/A"
+                rejection = await stream_image_to_file(response, image_full_path, IMAGE_CHUNK_SIZE)
+                if rejection:
+                    logger.warning(f"Original URL {image_url} returned {rejection}")
+                    return "N/A"
+            
+            logger.info(f"Successfully downloaded original image for {product_name}")
+            return image_full_path
+            
+        except httpx.RequestError as e:
+            logger.error(f"Fallback failed for {product_name}: {e}")
+            return "N/A"
     
     def extract_price_value(self, text: str) -> str:
         """Extract price from text"""
@@ -559,17 +764,8 @@ class HoskingsScraper:
             return "N/A"
         
         # Look for price patterns (Australian dollar format)
-        price_patterns = [
-            r'\$\s*[\d,]+\.?\d*',  # Dollar price format
-            r'\$\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?',  # Formatted dollar price
-        ]
-        
-        for pattern in price_patterns:
-            price_match = re.search(pattern, text)
-            if price_match:
-                return price_match.group(0)
-        
-        return "N/A"
+        price_match = _PRICE_RE.search(text)
+        return price_match.group(0) if price_match else "N/A"
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
@@ -578,5 +774,5 @@ class HoskingsScraper:
         # Remove extra whitespace and normalize
         text = ' '.join(text.split()).strip()
         # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
         return text
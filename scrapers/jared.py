@@ -3,14 +3,21 @@ import base64
 import os
 import uuid
 import logging
+import queue
+import threading
+import functools
+import mmap
 from datetime import datetime
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 import re
 from typing import Dict, Any, List
-import requests
+import httpx
+import aiofiles
 from urllib.parse import urlparse
-from openpyxl import Workbook
-from database.db_inseartin import insert_into_db, update_product_count
+from database.db_inseartin import insert_into_db
+from scrapers.xlsx_writer import XlsxSheetWriter
+from scrapers.scrape_utils import compile_prioritized, search_prioritized, link_downloaded_image, remove_partial_image
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +26,114 @@ logger = logging.getLogger(__name__)
 IMAGE_SAVE_PATH = os.getenv("IMAGE_SAVE_PATH")
 EXCEL_DATA_PATH = os.getenv("EXCEL_DATA_PATH")
 
+# Images are streamed to disk in chunks of this size instead of being buffered whole
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# Rows per database insert transaction
+DB_BATCH_SIZE = 500
+
+# Image URLs are expected to end in one of these (or to point at /productimages/)
+_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif'}
+
+# Client-error HTTP statuses that are still worth retrying (request timeout, rate limited)
+RETRYABLE_STATUS_CODES = {408, 429}
+
+# HTTP/2 lets all image requests to the Jared CDN share one multiplexed connection (needs httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Precompiled patterns used in the per-product hot loop
+# Standard price format ("$1,299.99"); also covers the stricter formatted-price pattern
+_PRICE_RE = re.compile(r'\$[\d,]+\.?\d*')
+_SALE_PRICE_RE = re.compile(r'\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?')
+_DISCOUNT_RE = re.compile(r'(\d+% off)', re.IGNORECASE)
+_DISCOUNT_PERCENT_RE = re.compile(r'(\d+)%')
+_WS_RE = re.compile(r'\s+')
+_IMAGE_260_RE = re.compile(r'(_260)(?=\.\w+$)')
+
+
+# Diamond weight patterns for Jared, in priority order
+_WEIGHT_RE = compile_prioritized((
+    r'(\d+(?:\.\d+)?)\s*ct\s*tw',  # "1.5 ct tw"
+    r'(\d+(?:\.\d+)?)\s*ctw',  # "1.5ctw"
+    r'(\d+(?:\.\d+)?)\s*carat',  # "1.5 carat"
+    r'(\d+/\d+)\s*ct',  # "1/2 ct"
+    r'(\d+-\d+/\d+)\s*ct'  # "1-1/2 ct"
+))
+
+# Gold type patterns for Jared, in priority order
+_GOLD_RE = compile_prioritized((
+    r'(\d{1,2}K)\s*(?:Yellow|White|Rose)\s*Gold',  # "14K Yellow Gold"
+    r'(Yellow|White|Rose)\s*Gold\s*(\d{1,2}K)',  # "Yellow Gold 14K"
+    r'(\d{1,2}K)\s*Gold',  # "14K Gold"
+    r'(Platinum|Sterling Silver|Silver)',  # Other metals
+    r'(Yellow Gold|White Gold|Rose Gold)'  # Gold colors
+))
+
+# Product tile selectors, in priority order
+_PRODUCT_SELECTORS = (
+    'div.product-grid_tile',  # Main product container
+    'div.product-item',       # Product item
+    'app-product-grid-item-akron',  # Angular component
+    'div[data-product-id]'    # Products with data attributes
+)
+
+# Product field selectors. Name, image, link and badge alternatives are joined into one union
+# selector each, so a field costs one tree walk and candidates come back in document order
+_NAME_SELECTORS = (
+    'h2.name a',  # Product name in header
+    '.product-tile-description a',  # Product description
+    'a[itemprop="url"]',  # Item prop URL
+    '.js-product-name-details a'  # JavaScript product name
+)
+_IMAGE_SELECTORS = (
+    'img[itemprop="image"]',  # Schema image
+    '.main-thumb img',  # Main thumbnail
+    'app-product-primary-image img',  # Primary image component
+    'img.plpimage',  # PLP image
+    'img[src*="productimages"]'  # Product images
+)
+_LINK_SELECTORS = (
+    'h2.name a',  # Name link
+    '.main-thumb',  # Thumbnail link
+    'a[itemprop="url"]',  # Schema URL
+    '.product-tile-description a'  # Description link
+)
+_BADGE_SELECTORS = (
+    '.product-tag',  # Product tags
+    '.secondary-badge .tag-container span',  # Secondary badges
+    '.badge-container span',  # Badge container
+    '.groupby-tablet-product-tags'  # Group badges
+)
+_NAME_SELECTOR_UNION = ', '.join(_NAME_SELECTORS)
+_IMAGE_SELECTOR_UNION = ', '.join(_IMAGE_SELECTORS)
+_LINK_SELECTOR_UNION = ', '.join(_LINK_SELECTORS)
+_BADGE_SELECTOR_UNION = ', '.join(_BADGE_SELECTORS)
+# Promotion selectors stay tiers in priority order (the last one is a catch-all)
+_PROMO_SELECTORS = (
+    '.tag-text',  # Discount tags
+    '.amor-tags .tag-text',  # Amor tags
+    '.discount-percentage',  # Discount percentage
+    '[class*="promotion"]'  # Any promotion class
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_url(url: str) -> str:
+    """Normalize image/link URL for Jared (pure, so repeated URLs come from the cache)"""
+    if not url:
+        return "N/A"
+    if url.startswith('http'):
+        return url
+    elif url.startswith('//'):
+        return f"https:{url}"
+    elif url.startswith('/'):
+        return f"https://www.jared.com{url}"
+    return url
+
 
 class JaredParser:
     """Parser for Jared product pages with database and Excel functionality"""
@@ -33,7 +148,7 @@ class JaredParser:
         os.makedirs(self.excel_data_path, exist_ok=True)
         os.makedirs(self.image_save_path, exist_ok=True)
     
-    def parse_and_save_products(self, products_data: List[Dict], page_title: str, page_url: str = "") -> Dict[str, Any]:
+    def parse_and_save_products(self, products_data: List[Dict], page_title: str, page_url: str = "", include_base64: bool = True) -> Dict[str, Any]:
         """
         Main method to parse products and save to database/Excel
         Returns: JSON response compatible with your requirements
@@ -64,113 +179,145 @@ class JaredParser:
             excel_path = os.path.join(self.excel_data_path, excel_filename)
             
             # Process products
-            database_records = []
+            total_count = 0
             successful_downloads = 0
             
-            # Create Excel workbook
-            wb = Workbook()
-            sheet = wb.active
-            sheet.title = "Jared Products"
+            # Parse every product first so the image downloads can run concurrently
+            # (sequentially: Lexbor trees must not be shared across threads)
+            parsed_products = []
+            for i, product_tile in enumerate(individual_products):
+                parsed_data = self._try_parse_product(i, product_tile)
+                if parsed_data is None:
+                    continue
+                
+                # Generate unique ID
+                unique_id = str(uuid.uuid4())
+                product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
+                parsed_products.append((i, unique_id, product_name, parsed_data))
             
-            # Add headers
-            headers = [
-                'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
-                'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
-                'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
-                'Session ID', 'Page URL'
+            # Download all images from one event loop over a shared client
+            image_jobs = [
+                (parsed_data.get('image_url'), product_name, unique_id)
+                for _, unique_id, product_name, parsed_data in parsed_products
             ]
-            sheet.append(headers)
+            image_paths = asyncio.run(self.download_images(image_jobs, timestamp, image_folder))
             
-            # Process each product
-            for i, product_html in enumerate(individual_products):
-                try:
-                    # Parse product data
-                    parsed_data = self.parse_product(product_html)
-                    
-                    # Generate unique ID
-                    unique_id = str(uuid.uuid4())
-                    product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
-                    
-                    # Download image - use sync method
-                    image_url = parsed_data.get('image_url')
-                    image_path = self.download_image(
-                        image_url, product_name, timestamp, image_folder, unique_id
-                    )
-                    
-                    if image_path != "N/A":
-                        successful_downloads += 1
-                    
-                    # Prepare additional info
-                    badges = parsed_data.get('badges', [])
-                    promotions = parsed_data.get('promotions', '')
-                    additional_info_parts = []
-                    
-                    if badges:
-                        additional_info_parts.extend(badges)
-                    if promotions and promotions != "N/A":
-                        additional_info_parts.append(promotions)
-                    
-                    additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
-                    
-                    # Create database record
-                    db_record = {
-                        'unique_id': unique_id,
-                        'current_date': current_date,
-                        'page_title': page_title,
-                        'product_name': product_name,
-                        'image_path': image_path,
-                        'price': parsed_data.get('price'),
-                        'diamond_weight': parsed_data.get('diamond_weight'),
-                        'gold_type': parsed_data.get('gold_type'),
-                        'additional_info': additional_info,
-                    }
-                    
-                    database_records.append(db_record)
-                    
-                    # Add to Excel
-                    sheet.append([
-                        unique_id,
-                        current_date.strftime('%Y-%m-%d'),
-                        page_title,
-                        product_name,
-                        image_path,
-                        parsed_data.get('gold_type', 'N/A'),
-                        parsed_data.get('price', 'N/A'),
-                        parsed_data.get('diamond_weight', 'N/A'),
-                        additional_info,
-                        current_time.strftime('%H:%M:%S'),
-                        image_url,
-                        parsed_data.get('link', 'N/A'),
-                        session_id,
-                        page_url
-                    ])
+            # Database rows are inserted in batches on a background thread while the Excel rows are built
+            record_queue = queue.Queue()
+            abort_inserts = threading.Event()
+            db_executor = ThreadPoolExecutor(max_workers=1)
+            db_future = db_executor.submit(self._insert_queued_records, record_queue, abort_inserts)
+            completed = False
+            
+            try:
+                # Row values shared by every product
+                date_str = current_date.strftime('%Y-%m-%d')
+                time_str = current_time.strftime('%H:%M:%S')
+                
+                # Stream the sheet straight into the .xlsx zip, one row at a time; saved when the block exits
+                with XlsxSheetWriter(excel_path, "Jared Products") as sheet:
+                    # Add headers
+                    headers = [
+                        'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
+                        'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
+                        'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
+                        'Session ID', 'Page URL'
+                    ]
+                    sheet.append(headers)
                     
-                    print(f"Processed product {i+1}: {product_name}")
+                    # Process each product
+                    for (i, unique_id, product_name, parsed_data), image_path in zip(parsed_products, image_paths):
+                        try:
+                            # A failed download drops the product, as the per-product loop did
+                            if isinstance(image_path, Exception):
+                                raise image_path
+                            
+                            image_url = parsed_data.get('image_url')
+                            
+                            if image_path != "N/A":
+                                successful_downloads += 1
+                            
+                            # Prepare additional info
+                            badges = parsed_data.get('badges', [])
+                            promotions = parsed_data.get('promotions', '')
+                            additional_info_parts = []
+                            
+                            if badges:
+                                additional_info_parts.extend(badges)
+                            if promotions and promotions != "N/A":
+                                additional_info_parts.append(promotions)
+                            
+                            additional_info = " | ".join(additional_info_parts) if additional_info_parts else "N/A"
+                            
+                            # Create database record
+                            db_record = {
+                                'unique_id': unique_id,
+                                'current_date': current_date,
+                                'page_title': page_title,
+                                'product_name': product_name,
+                                'image_path': image_path,
+                                'price': parsed_data.get('price'),
+                                'diamond_weight': parsed_data.get('diamond_weight'),
+                                'gold_type': parsed_data.get('gold_type'),
+                                'additional_info': additional_info,
+                            }
+                            
+                            record_queue.put(db_record)
+                            total_count += 1
+                            
+                            # Add to Excel
+                            sheet.append([
+                                unique_id,
+                                date_str,
+                                page_title,
+                                product_name,
+                                image_path,
+                                parsed_data.get('gold_type', 'N/A'),
+                                parsed_data.get('price', 'N/A'),
+                                parsed_data.get('diamond_weight', 'N/A'),
+                                additional_info,
+                                time_str,
+                                image_url,
+                                parsed_data.get('link', 'N/A'),
+                                session_id,
+                                page_url
+                            ])
+                            
+                            print(f"Processed product {i+1}: {product_name}")
+                            
+                        except Exception as e:
+                            print(f"Error processing product {i}: {e}")
+                            continue
                     
-                except Exception as e:
-                    print(f"Error processing product {i}: {e}")
-                    continue
-            
-            # Save Excel file
-            wb.save(excel_path)
-            print(f"Excel file saved: {excel_path}")
-            
-            # Insert data into the database and update product count
-            insert_into_db(database_records)
-            update_product_count(len(database_records))
+                    # End of records: the worker flushes its last batch while the file is saved and encoded
+                    record_queue.put(None)
+                
+                print(f"Excel file saved: {excel_path}")
+                
+                # Encode Excel file to base64 (callers that only need file_path can skip this)
+                # while the database thread commits its last batches
+                base64_file = self.encode_file_base64(excel_path) if include_base64 else None
+                
+                completed = True
+            finally:
+                # Always release the worker (a second end marker is harmless); if this request
+                # failed it drops the rows it has not sent yet instead of committing them
+                if not completed:
+                    abort_inserts.set()
+                record_queue.put(None)
+                db_executor.shutdown(wait=True)
             
-            # Encode Excel file to base64
-            with open(excel_path, "rb") as file:
-                base64_file = base64.b64encode(file.read()).decode("utf-8")
+            # Raises if a batch was not stored
+            db_future.result()
             
             # Return JSON response
             return {
-                'message': f'Successfully processed {len(database_records)} products',
+                'message': f'Successfully processed {total_count} products',
                 'session_id': session_id,
                 'excel_file': excel_filename,
-                'total_processed': len(database_records),
+                'total_processed': total_count,
                 'images_downloaded': successful_downloads,
-                'failed': len(individual_products) - len(database_records),
+                'failed': len(individual_products) - total_count,
                 'website_type': 'jared',
                 'base64_file': base64_file,
                 'file_path': excel_path
@@ -183,62 +330,80 @@ class JaredParser:
                 'message': 'Failed to process products'
             }
     
-    def parse_product(self, product_html: str) -> Dict[str, Any]:
-        """Parse individual product HTML"""
-        soup = BeautifulSoup(product_html, 'html.parser')
-        
+    def parse_product(self, node: LexborNode) -> Dict[str, Any]:
+        """Parse individual product tile (already parsed page node)"""
+        # The name is extracted once and reused for the weight and gold type
+        product_name = self._extract_product_name(node)
         return {
-            'product_name': self._extract_product_name(soup),
-            'price': self._extract_price(soup),
-            'image_url': self._extract_image(soup),
-            'link': self._extract_link(soup),
-            'diamond_weight': self._extract_diamond_weight(soup),
-            'gold_type': self._extract_gold_type(soup),
-            'badges': self._extract_badges(soup),
-            'promotions': self._extract_promotions(soup)
+            'product_name': product_name,
+            'price': self._extract_price(node),
+            'image_url': self._extract_image(node),
+            'link': self._extract_link(node),
+            'diamond_weight': self.extract_diamond_weight_value(product_name),
+            'gold_type': self.extract_gold_type_value(product_name),
+            'badges': self._extract_badges(node),
+            'promotions': self._extract_promotions(node)
         }
     
-    def extract_individual_products_from_html(self, html_content: str) -> List[str]:
-        """Extract individual product HTML blocks from Jared HTML"""
+    def _insert_queued_records(self, record_queue: queue.Queue, abort_inserts: threading.Event):
+        """
+        Insert records from the queue in DB_BATCH_SIZE transactions (with the product count) until None arrives.
+        Stops without inserting the rest once abort_inserts is set; raises if a batch was not stored.
+        """
+        batch = []
+        while True:
+            record = record_queue.get()
+            if abort_inserts.is_set():
+                return
+            if record is None:
+                break
+            batch.append(record)
+            if len(batch) >= DB_BATCH_SIZE:
+                self._insert_batch(batch)
+                batch = []
+        if batch:
+            self._insert_batch(batch)
+    
+    def _insert_batch(self, batch: List[Dict]):
+        """Insert one batch; insert_into_db logs and swallows database errors, so check its count"""
+        inserted = insert_into_db(batch, update_count=True)
+        if inserted != len(batch):
+            raise RuntimeError(f"Database insert stored {inserted} of {len(batch)} records")
+    
+    def _try_parse_product(self, index: int, product_tile: LexborNode):
+        """Parse one product tile; returns None if parsing fails"""
+        try:
+            return self.parse_product(product_tile)
+        except Exception as e:
+            print(f"Error processing product {index}: {e}")
+            return None
+    
+    def extract_individual_products_from_html(self, html_content: str) -> List[LexborNode]:
+        """Extract individual product tiles from Jared HTML (parsed once with the Lexbor C parser)"""
         if not html_content:
             return []
         
-        soup = BeautifulSoup(html_content, 'html.parser')
+        tree = LexborHTMLParser(html_content)
+        # Lexbor's text() includes script/style contents (BeautifulSoup's get_text() skipped them)
+        tree.strip_tags(['script', 'style'])
         
         # Multiple ways to find Jared products
-        product_selectors = [
-            'div.product-grid_tile',  # Main product container
-            'div.product-item',       # Product item
-            'app-product-grid-item-akron',  # Angular component
-            'div[data-product-id]'    # Products with data attributes
-        ]
-        
         individual_products = []
         
-        for selector in product_selectors:
-            product_tiles = soup.select(selector)
-            for tile in product_tiles:
-                individual_products.append(str(tile))
+        for selector in _PRODUCT_SELECTORS:
+            individual_products = tree.css(selector)
             if individual_products:
                 break  # Stop if we found products with this selector
         
         print(f"Found {len(individual_products)} product tiles in Jared HTML")
         return individual_products
     
-    def _extract_product_name(self, soup) -> str:
+    def _extract_product_name(self, node) -> str:
         """Extract product name from Jared product tile"""
-        # Try multiple selectors for product name
-        name_selectors = [
-            'h2.name a',  # Product name in header
-            '.product-tile-description a',  # Product description
-            'a[itemprop="url"]',  # Item prop URL
-            '.js-product-name-details a'  # JavaScript product name
-        ]
-        
-        for selector in name_selectors:
-            name_element = soup.select_one(selector)
-            if name_element and name_element.get_text(strip=True):
-                return self.clean_text(name_element.get_text())
+        # First name element (header, description, item prop, JS name) with text
+        for name_element in node.css(_NAME_SELECTOR_UNION):
+            if name_element.text(strip=True):
+                return self.clean_text(name_element.text())
         
         return "N/A"
     
@@ -267,24 +432,24 @@ class JaredParser:
         
     #     return "N/A"
     
-    def _extract_price(self, soup) -> str:
+    def _extract_price(self, node) -> str:
         """Extract price, discount, and original price for Zales product"""
         
-        html_text = soup.get_text(" ", strip=True)
+        html_text = node.text(separator=' ', strip=True)
 
         # --- 1) Extract sale price ---
-        sale_price_match = re.search(r'\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?', html_text)
+        sale_price_match = _SALE_PRICE_RE.search(html_text)
         sale_price = sale_price_match.group(0) if sale_price_match else "N/A"
 
         # --- 2) Extract discount ---
-        discount_match = re.search(r'(\d+% off)', html_text, re.IGNORECASE)
+        discount_match = _DISCOUNT_RE.search(html_text)
         discount = discount_match.group(0) if discount_match else "N/A"
 
         # --- 3) Calculate original price ---
         original_price = "N/A"
         if sale_price != "N/A" and discount != "N/A":
             try:
-                discount_percent = int(re.search(r'(\d+)%', discount).group(1))
+                discount_percent = int(_DISCOUNT_PERCENT_RE.search(discount).group(1))
                 sale_value = float(sale_price.replace("$", "").replace(",", ""))
                 original_value = sale_value / (1 - (discount_percent / 100))
                 original_price = f"${original_value:,.2f}"
@@ -293,89 +458,43 @@ class JaredParser:
 
         return f"{sale_price} | {discount} | {original_price}"
     
-    def _extract_image(self, soup) -> str:
+    def _extract_image(self, node) -> str:
         """Extract product image URL from Jared product"""
-        # Image selectors
-        img_selectors = [
-            'img[itemprop="image"]',  # Schema image
-            '.main-thumb img',  # Main thumbnail
-            'app-product-primary-image img',  # Primary image component
-            'img.plpimage',  # PLP image
-            'img[src*="productimages"]'  # Product images
-        ]
-        
-        for selector in img_selectors:
-            img_element = soup.select_one(selector)
-            if img_element and img_element.get('src'):
-                src = img_element.get('src')
-                return self._normalize_image_url(src)
+        for img_element in node.css(_IMAGE_SELECTOR_UNION):
+            src = img_element.attributes.get('src')
+            if src:
+                return _normalize_url(src)
         
         return "N/A"
     
-    def _extract_link(self, soup) -> str:
+    def _extract_link(self, node) -> str:
         """Extract product link from Jared product"""
-        # Link selectors
-        link_selectors = [
-            'h2.name a',  # Name link
-            '.main-thumb',  # Thumbnail link
-            'a[itemprop="url"]',  # Schema URL
-            '.product-tile-description a'  # Description link
-        ]
-        
-        for selector in link_selectors:
-            link_element = soup.select_one(selector)
-            if link_element and link_element.get('href'):
-                href = link_element.get('href')
-                return self._normalize_link_url(href)
+        for link_element in node.css(_LINK_SELECTOR_UNION):
+            href = link_element.attributes.get('href')
+            if href:
+                return _normalize_url(href)
         
         return "N/A"
     
-    def _extract_diamond_weight(self, soup) -> str:
-        """Extract diamond weight from product name"""
-        product_name = self._extract_product_name(soup)
-        return self.extract_diamond_weight_value(product_name)
-    
-    def _extract_gold_type(self, soup) -> str:
-        """Extract gold type from product name"""
-        product_name = self._extract_product_name(soup)
-        return self.extract_gold_type_value(product_name)
-    
-    def _extract_badges(self, soup) -> list:
+    def _extract_badges(self, node) -> list:
         """Extract badge information from Jared product"""
         badges = []
         
-        # Badge selectors
-        badge_selectors = [
-            '.product-tag',  # Product tags
-            '.secondary-badge .tag-container span',  # Secondary badges
-            '.badge-container span',  # Badge container
-            '.groupby-tablet-product-tags'  # Group badges
-        ]
-        
-        for selector in badge_selectors:
-            badge_elements = soup.select(selector)
-            for badge in badge_elements:
-                badge_text = self.clean_text(badge.get_text())
-                if badge_text and badge_text not in badges:
-                    badges.append(badge_text)
+        # Lexbor repeats an element once per selector it matches; the text check drops the repeats
+        for badge in node.css(_BADGE_SELECTOR_UNION):
+            badge_text = self.clean_text(badge.text())
+            if badge_text and badge_text not in badges:
+                badges.append(badge_text)
         
         return badges
     
-    def _extract_promotions(self, soup) -> str:
+    def _extract_promotions(self, node) -> str:
         """Extract promotion text from Jared product"""
-        # Promotion selectors
-        promo_selectors = [
-            '.tag-text',  # Discount tags
-            '.amor-tags .tag-text',  # Amor tags
-            '.discount-percentage',  # Discount percentage
-            '[class*="promotion"]'  # Any promotion class
-        ]
-        
-        for selector in promo_selectors:
-            promo_elements = soup.select(selector)
+        for selector in _PROMO_SELECTORS:
+            promo_elements = node.css(selector)
             promo_texts = []
             for promo in promo_elements:
-                promo_text = self.clean_text(promo.get_text())
+                promo_text = self.clean_text(promo.text())
                 if promo_text and "off" in promo_text.lower():
                     promo_texts.append(promo_text)
             
@@ -384,29 +503,14 @@ class JaredParser:
         
         return "N/A"
     
-    def _normalize_image_url(self, url: str) -> str:
-        """Normalize image URL for Jared"""
-        if not url:
-            return "N/A"
-        if url.startswith('http'):
-            return url
-        elif url.startswith('//'):
-            return f"https:{url}"
-        elif url.startswith('/'):
-            return f"https://www.jared.com{url}"
-        return url
-    
-    def _normalize_link_url(self, url: str) -> str:
-        """Normalize link URL for Jared"""
-        if not url:
-            return "N/A"
-        if url.startswith('http'):
-            return url
-        elif url.startswith('//'):
-            return f"https:{url}"
-        elif url.startswith('/'):
-            return f"https://www.jared.com{url}"
-        return url
+    def encode_file_base64(self, file_path: str) -> str:
+        """Base64-encode a file straight from a read-only memory map (no read() copy of the file)"""
+        with open(file_path, "rb") as file:
+            # mmap refuses zero-length files
+            if os.fstat(file.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return base64.b64encode(mapped).decode("ascii")
 
     def modify_image_url(self, image_url: str) -> str:
         """Modify the image URL to replace '_260' with '_1200' while keeping query parameters."""
@@ -420,13 +524,54 @@ class JaredParser:
             query_params = f"?{query_params}"
 
         # Replace '_260' with '_1200' while keeping the rest of the URL intact
-        modified_url = re.sub(r'(_260)(?=\.\w+$)', '_1200', image_url)
+        modified_url = _IMAGE_260_RE.sub('_1200', image_url)
 
         return modified_url + query_params  # Append query parameters if they exist
 
-    def download_image(self, image_url: str, product_name: str, timestamp: str, 
-                      image_folder: str, unique_id: str, retries: int = 3) -> str:
-        """Synchronous image download method with enhanced error handling"""
+    async def download_images(self, jobs: List[tuple], timestamp: str, image_folder: str, concurrency: int = 32) -> List[Any]:
+        """
+        Download (image_url, product_name, unique_id) jobs concurrently over one shared client
+        Returns: image path, "N/A" or the raised exception for each job, in job order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+        # One download per distinct (resized) image URL; later jobs for the same URL wait on it
+        downloads_in_flight: Dict[str, asyncio.Future] = {}
+
+        # Follow CDN redirects, as requests.get did
+        async with httpx.AsyncClient(
+            http2=HTTP2_ENABLED, timeout=30.0, limits=limits, follow_redirects=True
+        ) as client:
+            async def bounded_download(image_url, product_name, unique_id):
+                async with semaphore:
+                    return await self.download_image_async(
+                        client, image_url, product_name, timestamp, image_folder, unique_id
+                    )
+
+            async def shared_download(image_url, product_name, unique_id):
+                if not image_url or image_url == "N/A":
+                    return "N/A"
+                url_key = self.modify_image_url(image_url)
+                download = downloads_in_flight.get(url_key)
+                if download is None:
+                    download = asyncio.ensure_future(bounded_download(image_url, product_name, unique_id))
+                    downloads_in_flight[url_key] = download
+                    return await download
+                
+                # Repeated image: wait outside the semaphore, then give this product its own file
+                source_path = await download
+                if source_path == "N/A":
+                    return "N/A"
+                return link_downloaded_image(source_path, image_folder, unique_id, timestamp)
+
+            return await asyncio.gather(
+                *(shared_download(*job) for job in jobs),
+                return_exceptions=True
+            )
+
+    async def download_image_async(self, client: httpx.AsyncClient, image_url: str, product_name: str, timestamp: str, 
+                                   image_folder: str, unique_id: str, retries: int = 3) -> str:
+        """Async image download over the shared client with enhanced error handling"""
         if not image_url or image_url == "N/A":
             return "N/A"
 
@@ -435,28 +580,45 @@ class JaredParser:
         image_full_path = os.path.join(image_folder, image_filename)
         modified_url = self.modify_image_url(image_url)
         
+        # Don't spend a request (and its retries) on a URL that cannot be an image
+        file_ext = os.path.splitext(urlparse(modified_url).path)[1].lower()
+        if file_ext not in _IMAGE_EXTENSIONS and 'productimages' not in modified_url:
+            logger.warning(f"Skipping {product_name}: {modified_url} does not look like an image URL")
+            return "N/A"
+        
         for attempt in range(retries):
             try:
-                response = requests.get(modified_url, timeout=30)
-                response.raise_for_status()
-                
-                # Verify it's actually an image
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    logger.warning(f"URL {modified_url} returned non-image content type: {content_type}")
-                    continue
+                async with client.stream("GET", modified_url) as response:
+                    response.raise_for_status()
+                    
+                    # Verify it's actually an image
+                    content_type = response.headers.get('content-type', '')
+                    if not content_type.startswith('image/'):
+                        logger.warning(f"URL {modified_url} returned non-image content type: {content_type}")
+                        continue
                     
-                with open(image_full_path, "wb") as f:
-                    f.write(response.content)
+                    # Stream to disk so per-image memory stays bounded by the chunk size
+                    async with aiofiles.open(image_full_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(IMAGE_CHUNK_SIZE):
+                            await f.write(chunk)
                 
                 logger.info(f"Successfully downloaded image for {product_name}")
                 return image_full_path
                 
-            except requests.RequestException as e:
+            except httpx.HTTPStatusError as e:
+                # A missing or forbidden image will answer the same way every time
+                status_code = e.response.status_code
+                if status_code < 500 and status_code not in RETRYABLE_STATUS_CODES:
+                    logger.warning(f"Error downloading {product_name}: HTTP {status_code}, not retrying")
+                    break
+                logger.warning(f"Retry {attempt + 1}/{retries} - Error downloading {product_name}: HTTP {status_code}")
+            except httpx.HTTPError as e:
+                # A body cut off mid-stream must not be left behind as a truncated image
+                remove_partial_image(image_full_path)
                 logger.warning(f"Retry {attempt + 1}/{retries} - Error downloading {product_name}: {e}")
-                if attempt < retries - 1:
-                    import time
-                    time.sleep(2)  # Wait before retry
+            
+            if attempt < retries - 1:
+                await asyncio.sleep(0.25 * 2 ** attempt)  # Exponential backoff before retry
         
         logger.error(f"Failed to download {product_name} after {retries} attempts.")
         return "N/A"
@@ -467,17 +629,8 @@ class JaredParser:
             return "N/A"
         
         # Look for price patterns
-        price_patterns = [
-            r'\$[\d,]+\.?\d*',  # Standard price format
-            r'\$\d{1,3}(?:,\d{3})*(?:\.\d{2})?',  # Formatted price
-        ]
-        
-        for pattern in price_patterns:
-            price_match = re.search(pattern, text)
-            if price_match:
-                return price_match.group(0)
-        
-        return "N/A"
+        price_match = _PRICE_RE.search(text)
+        return price_match.group(0) if price_match else "N/A"
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
@@ -486,7 +639,7 @@ class JaredParser:
         # Remove extra whitespace and normalize
         text = ' '.join(text.split()).strip()
         # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
         return text
     
     def extract_diamond_weight_value(self, text: str) -> str:
@@ -494,23 +647,14 @@ class JaredParser:
         if not text:
             return "N/A"
         
-        # Diamond weight patterns for Jared
-        weight_patterns = [
-            r'(\d+(?:\.\d+)?)\s*ct\s*tw',  # "1.5 ct tw"
-            r'(\d+(?:\.\d+)?)\s*ctw',  # "1.5ctw"
-            r'(\d+(?:\.\d+)?)\s*carat',  # "1.5 carat"
-            r'(\d+/\d+)\s*ct',  # "1/2 ct"
-            r'(\d+-\d+/\d+)\s*ct'  # "1-1/2 ct"
-        ]
-        
-        for pattern in weight_patterns:
-            weight_match = re.search(pattern, text, re.IGNORECASE)
-            if weight_match:
-                weight = weight_match.group(1)
-                # Standardize the format
-                if 'tw' not in text.lower():
-                    return f"{weight} ct tw"
-                return f"{weight} ct"
+        # One scan finds the highest-priority weight pattern present
+        weight_groups = search_prioritized(_WEIGHT_RE, text)
+        if weight_groups:
+            weight = weight_groups[0]
+            # Standardize the format
+            if 'tw' not in text.lower():
+                return f"{weight} ct tw"
+            return f"{weight} ct"
         
         return "N/A"
     
@@ -519,20 +663,11 @@ class JaredParser:
         if not text:
             return "N/A"
         
-        # Gold type patterns for Jared
-        gold_patterns = [
-            r'(\d{1,2}K)\s*(?:Yellow|White|Rose)\s*Gold',  # "14K Yellow Gold"
-            r'(Yellow|White|Rose)\s*Gold\s*(\d{1,2}K)',  # "Yellow Gold 14K"
-            r'(\d{1,2}K)\s*Gold',  # "14K Gold"
-            r'(Platinum|Sterling Silver|Silver)',  # Other metals
-            r'(Yellow Gold|White Gold|Rose Gold)'  # Gold colors
-        ]
-        
-        for pattern in gold_patterns:
-            gold_match = re.search(pattern, text, re.IGNORECASE)
-            if gold_match:
-                # Return the matched groups, filtering out None
-                gold_parts = [part for part in gold_match.groups() if part]
-                return ' '.join(gold_parts).title()
+        # One scan finds the highest-priority gold pattern present
+        gold_groups = search_prioritized(_GOLD_RE, text)
+        if gold_groups:
+            # Return the matched groups, filtering out None
+            gold_parts = [part for part in gold_groups if part]
+            return ' '.join(gold_parts).title()
         
         return "N/A"
\ No newline at end of file
@@ -4,13 +4,16 @@ import os
 import uuid
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 import re
 from typing import Dict, Any, List
-import requests
+import httpx
+import aiofiles
 from urllib.parse import urlparse
-from openpyxl import Workbook
-from database.db_inseartin import insert_into_db, update_product_count
+from database.db_inseartin import insert_into_db, build_db_row
+from scrapers.xlsx_writer import XlsxSheetWriter
+from scrapers.scrape_utils import remove_partial_image
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +22,19 @@ logger = logging.getLogger(__name__)
 IMAGE_SAVE_PATH = os.getenv("IMAGE_SAVE_PATH")
 EXCEL_DATA_PATH = os.getenv("EXCEL_DATA_PATH")
 
+# Images are streamed to disk in chunks of this size instead of being buffered whole
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+# HTTP/2 lets all image requests to the scene7 CDN share one multiplexed connection (needs httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Client-error HTTP statuses that are still worth retrying (request timeout, rate limited)
+RETRYABLE_STATUS_CODES = {408, 429}
+
 
 class JCPenneyParser:
     """Parser for JCPenney product pages with database and Excel functionality"""
@@ -67,22 +83,8 @@ class JCPenneyParser:
             database_records = []
             successful_downloads = 0
             
-            # Create Excel workbook
-            wb = Workbook()
-            sheet = wb.active
-            sheet.title = "JCPenney Products"
-            
-            # Add headers
-            headers = [
-                'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
-                'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
-                'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
-                'Session ID', 'Page URL', 'Original Price', 'Discount Code',
-                'Rating', 'Colors', 'Promotion Text'
-            ]
-            sheet.append(headers)
-            
-            # Process each product
+            # Parse every product first so the image downloads can run concurrently
+            parsed_products = []
             for i, product_html in enumerate(individual_products):
                 try:
                     # Parse product data
@@ -91,74 +93,102 @@ class JCPenneyParser:
                     # Generate unique ID
                     unique_id = str(uuid.uuid4())
                     product_name = parsed_data.get('product_name', 'Unknown Product')[:495]
-                    
-                    # Download image - use sync method
-                    image_url = parsed_data.get('image_url')
-                    image_path = self.download_image(
-                        image_url, product_name, timestamp, image_folder, unique_id
-                    )
-                    
-                    if image_path != "N/A":
-                        successful_downloads += 1
-                    
-                    # Prepare additional info with all the new fields
-                    additional_info = self._build_additional_info(parsed_data)
-                    
-                    # Create database record
-                    db_record = {
-                        'unique_id': unique_id,
-                        'current_date': current_date,
-                        'page_title': page_title,
-                        'product_name': product_name,
-                        'image_path': image_path,
-                        'price': parsed_data.get('price'),
-                        'diamond_weight': parsed_data.get('diamond_weight'),
-                        'gold_type': parsed_data.get('gold_type'),
-                        'additional_info': additional_info,
-                    }
-                    
-                    database_records.append(db_record)
-                    
-                    # Add to Excel
-                    sheet.append([
-                        unique_id,
-                        current_date.strftime('%Y-%m-%d'),
-                        page_title,
-                        product_name,
-                        image_path,
-                        parsed_data.get('gold_type', 'N/A'),
-                        parsed_data.get('price', 'N/A'),
-                        parsed_data.get('diamond_weight', 'N/A'),
-                        additional_info,
-                        current_time.strftime('%H:%M:%S'),
-                        image_url,
-                        parsed_data.get('link', 'N/A'),
-                        session_id,
-                        page_url,
-                        parsed_data.get('original_price', 'N/A'),
-                        parsed_data.get('discount_code', 'N/A'),
-                        parsed_data.get('rating', 'N/A'),
-                        parsed_data.get('colors', 'N/A'),
-                        parsed_data.get('promotion_text', 'N/A')
-                    ])
-                    
-                    print(f"Processed product {i+1}: {product_name}")
+                    parsed_products.append((i, unique_id, product_name, parsed_data))
                     
                 except Exception as e:
                     print(f"Error processing product {i}: {e}")
                     continue
             
-            # Save Excel file
-            wb.save(excel_path)
-            print(f"Excel file saved: {excel_path}")
+            # Download all images from one event loop over a shared client
+            image_jobs = [
+                (parsed_data.get('image_url'), product_name, unique_id)
+                for _, unique_id, product_name, parsed_data in parsed_products
+            ]
+            image_paths = asyncio.run(self.download_images(image_jobs, timestamp, image_folder))
+            
+            # Stream the sheet straight into the .xlsx zip, one row at a time; saved when the block exits
+            with XlsxSheetWriter(excel_path, "JCPenney Products") as sheet:
+                # Add headers
+                headers = [
+                    'Unique ID', 'Current Date', 'Page Title', 'Product Name', 
+                    'Image Path', 'Gold Type', 'Price', 'Diamond Weight', 
+                    'Additional Info', 'Scrape Time', 'Image URL', 'Product Link',
+                    'Session ID', 'Page URL', 'Original Price', 'Discount Code',
+                    'Rating', 'Colors', 'Promotion Text'
+                ]
+                sheet.append(headers)
+                
+                # Process each product
+                for (i, unique_id, product_name, parsed_data), image_path in zip(parsed_products, image_paths):
+                    try:
+                        # A failed download drops the product, as the per-product loop did
+                        if isinstance(image_path, Exception):
+                            raise image_path
+                        
+                        image_url = parsed_data.get('image_url')
+                        
+                        if image_path != "N/A":
+                            successful_downloads += 1
+                        
+                        # Prepare additional info with all the new fields
+                        additional_info = self._build_additional_info(parsed_data)
+                        
+                        # Create database record (tuple in table column order)
+                        database_records.append(build_db_row(
+                            unique_id,
+                            current_date,
+                            page_title,
+                            product_name,
+                            image_path,
+                            parsed_data.get('price'),
+                            additional_info
+                        ))
+                        
+                        # Add to Excel
+                        sheet.append([
+                            unique_id,
+                            current_date.strftime('%Y-%m-%d'),
+                            page_title,
+                            product_name,
+                            image_path,
+                            parsed_data.get('gold_type', 'N/A'),
+                            parsed_data.get('price', 'N/A'),
+                            parsed_data.get('diamond_weight', 'N/A'),
+                            additional_info,
+                            current_time.strftime('%H:%M:%S'),
+                            image_url,
+                            parsed_data.get('link', 'N/A'),
+                            session_id,
+                            page_url,
+                            parsed_data.get('original_price', 'N/A'),
+                            parsed_data.get('discount_code', 'N/A'),
+                            parsed_data.get('rating', 'N/A'),
+                            parsed_data.get('colors', 'N/A'),
+                            parsed_data.get('promotion_text', 'N/A')
+                        ])
+                        
+                        print(f"Processed product {i+1}: {product_name}")
+                        
+                    except Exception as e:
+                        print(f"Error processing product {i}: {e}")
+                        continue
             
-            # Insert data into the database and update product count
-            insert_into_db(database_records)
-            update_product_count(len(database_records))
+            print(f"Excel file saved: {excel_path}")
             
-            # Encode Excel file to base64
-            with open(excel_path, "rb") as file:
-                base64_file = base64.b64encode(file.read()).decode("utf-8")
+            # Insert data and update product count in a single transaction on a worker thread,
+            # while the Excel file is encoded to base64; the two are independent
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                db_future = (
+                    executor.submit(insert_into_db, database_records, update_count=True)
+                    if database_records else None
+                )
+                with open(excel_path, "rb") as file:
+                    base64_file = base64.b64encode(file.read()).decode("ascii")
+                # insert_into_db logs and swallows database errors, so check its count
+                if db_future is not None:
+                    inserted = db_future.result()
+                    if inserted != len(database_records):
+                        raise RuntimeError(f"Database insert stored {inserted} of {len(database_records)} records")
             
             # Return JSON response
             return {
@@ -612,9 +642,32 @@ class JCPenneyParser:
         
         return image_url
 
-    def download_image(self, image_url: str, product_name: str, timestamp: str, 
-                      image_folder: str, unique_id: str, retries: int = 3) -> str:
-        """Synchronous image download method with enhanced error handling"""
+    async def download_images(self, jobs: List[tuple], timestamp: str, image_folder: str, concurrency: int = 32) -> List[Any]:
+        """
+        Download (image_url, product_name, unique_id) jobs concurrently over one shared client
+        Returns: image path, "N/A" or the raised exception for each job, in job order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+        # Follow CDN redirects, as requests.get did
+        async with httpx.AsyncClient(
+            http2=HTTP2_ENABLED, timeout=30.0, limits=limits, follow_redirects=True
+        ) as client:
+            async def bounded_download(image_url, product_name, unique_id):
+                async with semaphore:
+                    return await self.download_image_async(
+                        client, image_url, product_name, timestamp, image_folder, unique_id
+                    )
+
+            return await asyncio.gather(
+                *(bounded_download(*job) for job in jobs),
+                return_exceptions=True
+            )
+
+    async def download_image_async(self, client: httpx.AsyncClient, image_url: str, product_name: str, timestamp: str, 
+                                   image_folder: str, unique_id: str, retries: int = 3) -> str:
+        """Async image download over the shared client with enhanced error handling"""
         if not image_url or image_url == "N/A":
             return "N/A"
 
@@ -625,26 +678,38 @@ class JCPenneyParser:
         
         for attempt in range(retries):
             try:
-                response = requests.get(modified_url, timeout=30)
-                response.raise_for_status()
-                
-                # Verify it's actually an image
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    logger.warning(f"URL {modified_url} returned non-image content type: {content_type}")
-                    continue
+                async with client.stream("GET", modified_url) as response:
+                    response.raise_for_status()
                     
-                with open(image_full_path, "wb") as f:
-                    f.write(response.content)
+                    # Verify it's actually an image
+                    content_type = response.headers.get('content-type', '')
+                    if not content_type.startswith('image/'):
+                        logger.warning(f"URL {modified_url} returned non-image content type: {content_type}")
+                        continue
+                    
+                    # Stream to disk so per-image memory stays bounded by the chunk size
+                    async with aiofiles.open(image_full_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(IMAGE_CHUNK_SIZE):
+                            await f.write(chunk)
                 
                 logger.info(f"Successfully downloaded image for {product_name}")
                 return image_full_path
                 
-            except requests.RequestException as e:
+            except httpx.HTTPStatusError as e:
+                # A missing, forbidden or unresolved image will answer the same way every time
+                status_code = e.response.status_code
+                if status_code < 500 and status_code not in RETRYABLE_STATUS_CODES:
+                    logger.warning(f"Error downloading {product_name}: HTTP {status_code}, not retrying")
+                    break
+                logger.warning(f"Retry {attempt + 1}/{retries} - Error downloading {product_name}: HTTP {status_code}")
+                if attempt < retries - 1:
+                    await asyncio.sleep(2)  # Wait before retry
+            except httpx.HTTPError as e:
+                # A body cut off mid-stream must not be left behind as a truncated image
+                remove_partial_image(image_full_path)
                 logger.warning(f"Retry {attempt + 1}/{retries} - Error downloading {product_name}: {e}")
                 if attempt < retries - 1:
-                    import time
-                    time.sleep(2)  # Wait before retry
+                    await asyncio.sleep(2)  # Wait before retry
         
         logger.error(f"Failed to download {product_name} after {retries} attempts.")
         return "N/A"
@@ -0,0 +1,102 @@
+import os
+import re
+import shutil
+import logging
+import aiofiles
+from selectolax.lexbor import LexborNode
+
+logger = logging.getLogger(__name__)
+
+# Larger responses are not product images worth keeping
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+
+def compile_prioritized(patterns):
+    """
+    Combine prioritised patterns into one case-insensitive alternation wrapped in a lookahead,
+    so a single scan reports, at every position, the highest-priority pattern matching there.
+    Returns the regex and the (start, end) group numbers of each pattern's own groups.
+    """
+    regex = re.compile(
+        '(?=' + '|'.join(f'(?P<p{rank}>{pattern})' for rank, pattern in enumerate(patterns)) + ')',
+        re.IGNORECASE
+    )
+    bounds = [regex.groupindex[f'p{rank}'] for rank in range(len(patterns))] + [regex.groups + 1]
+    return regex, [(bounds[rank] + 1, bounds[rank + 1]) for rank in range(len(patterns))]
+
+
+def search_prioritized(compiled, text):
+    """Return the groups of the first pattern (in priority order) found in text, like trying each in turn"""
+    regex, group_ranges = compiled
+    best_match = None
+    best_rank = len(group_ranges)
+    for match in regex.finditer(text):
+        rank = int(match.lastgroup[1:])
+        if rank < best_rank:
+            best_match, best_rank = match, rank
+            if rank == 0:
+                break
+    if best_match is None:
+        return None
+    start, end = group_ranges[best_rank]
+    return tuple(best_match.group(index) for index in range(start, end))
+
+
+def node_matches(node: LexborNode, selector: str) -> bool:
+    """True if node itself matches selector (Lexbor's css() includes the node it is called on)"""
+    first_match = node.css_first(selector)
+    return first_match is not None and first_match.mem_id == node.mem_id
+
+
+def link_downloaded_image(source_path, image_folder, unique_id, timestamp):
+    """Give a product its own file for an already downloaded image (hardlink, copy as fallback)"""
+    image_full_path = os.path.join(image_folder, f"{unique_id}_{timestamp}.jpg")
+    try:
+        try:
+            os.link(source_path, image_full_path)
+        except OSError:
+            shutil.copyfile(source_path, image_full_path)
+        return image_full_path
+    except OSError as e:
+        logger.warning(f"Could not reuse downloaded image {source_path}: {e}")
+        return "N/A"
+
+
+def reject_image_response(response) -> str:
+    """Return why a response should not be saved as an image, or an empty string if it should"""
+    content_type = response.headers.get('content-type', '')
+    if not content_type.startswith('image/'):
+        return f"non-image content type: {content_type}"
+    content_length = response.headers.get('content-length', '')
+    if content_length.isdigit() and int(content_length) > MAX_IMAGE_BYTES:
+        return f"oversized image: {content_length} bytes"
+    return ""
+
+
+async def stream_image_to_file(response, image_full_path, chunk_size) -> str:
+    """
+    Stream an image response body to disk, counting bytes as they arrive so a body without
+    (or lying about) Content-Length is cut off at MAX_IMAGE_BYTES and its partial file removed.
+    Returns why the image was not saved, or an empty string if it was.
+    """
+    received = 0
+    async with aiofiles.open(image_full_path, "wb") as f:
+        async for chunk in response.aiter_bytes(chunk_size):
+            received += len(chunk)
+            if received > MAX_IMAGE_BYTES:
+                break
+            await f.write(chunk)
+    if received <= MAX_IMAGE_BYTES:
+        return ""
+    remove_partial_image(image_full_path)
+    return f"oversized image: more than {MAX_IMAGE_BYTES} bytes"
+
+
+def remove_partial_image(image_full_path):
+    """Delete an image file whose download did not complete, if one was started"""
+    try:
+        os.remove(image_full_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove partial image {image_full_path}: {e}")
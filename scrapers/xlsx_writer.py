@@ -0,0 +1,169 @@
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+# Characters that are not allowed in XML 1.0 documents
+_ILLEGAL_XML_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={sheet_name} sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_HEADER_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+_SHEET_FOOTER_XML = '</sheetData></worksheet>'
+
+
+class XlsxSheetWriter:
+    """Write-once, single-sheet .xlsx writer that streams rows of inline strings straight into the zip"""
+
+    def __init__(self, path, sheet_name: str = "Sheet1"):
+        """path may be a filename or a writable binary file object (e.g. io.BytesIO)"""
+        self.path = path
+        self.sheet_name = sheet_name[:31]
+        self.row_count = 0
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1)
+        self._sheet = self._zip.open('xl/worksheets/sheet1.xml', 'w')
+        self._sheet.write(_SHEET_HEADER_XML.encode('utf-8'))
+
+    def append(self, row):
+        """Append one row; values are written as text, None as an empty cell"""
+        self.row_count += 1
+        cells = []
+        for value in row:
+            if value is None:
+                cells.append('<c/>')
+                continue
+            text = escape(_ILLEGAL_XML_CHARS_RE.sub('', str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        self._sheet.write(f'<row r="{self.row_count}">{"".join(cells)}</row>'.encode('utf-8'))
+
+    def close(self):
+        """Finish the worksheet and write the remaining package parts"""
+        if self._zip is None:
+            return
+        self._sheet.write(_SHEET_FOOTER_XML.encode('utf-8'))
+        self._sheet.close()
+        self._zip.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        self._zip.writestr('_rels/.rels', _ROOT_RELS_XML)
+        self._zip.writestr('xl/workbook.xml', _WORKBOOK_XML.format(sheet_name=quoteattr(self.sheet_name)))
+        self._zip.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        self._zip.close()
+        self._zip = None
+
+    def abort(self):
+        """Close without finishing the package and delete the incomplete file (file objects are left to the caller)"""
+        if self._zip is None:
+            return
+        zip_file, self._zip = self._zip, None
+        try:
+            self._sheet.close()
+        finally:
+            zip_file.close()
+        if isinstance(self.path, (str, os.PathLike)):
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Finish the file on success; on an exception delete it rather than leave a truncated .xlsx"""
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SegmentedXlsxWriter:
+    """XlsxSheetWriter that rolls over to a new file every segment_size data rows, repeating the header row"""
+
+    def __init__(self, path_prefix: str, headers, segment_size: int = 250_000, sheet_name: str = "Sheet1"):
+        """The first file is <path_prefix>.xlsx, later ones <path_prefix>_2.xlsx, <path_prefix>_3.xlsx, ..."""
+        self.path_prefix = path_prefix
+        self.headers = headers
+        self.segment_size = segment_size
+        self.sheet_name = sheet_name
+        self.paths = []
+        self._writer = None
+        self._segment_rows = 0
+        self._open_segment()
+
+    def _open_segment(self):
+        suffix = f"_{len(self.paths) + 1}" if self.paths else ""
+        path = f"{self.path_prefix}{suffix}.xlsx"
+        self._writer = XlsxSheetWriter(path, self.sheet_name)
+        self._writer.append(self.headers)
+        self._segment_rows = 0
+        self.paths.append(path)
+
+    def append(self, row):
+        """Append one data row, starting a new file first if the current one is full"""
+        if self._segment_rows >= self.segment_size:
+            self._writer.close()
+            self._open_segment()
+        self._writer.append(row)
+        self._segment_rows += 1
+
+    def close(self):
+        """Finish the current file"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def abort(self):
+        """Delete the current, unfinished file; segments already finished are kept"""
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+            self.paths.pop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Finish the current file on success; on an exception delete it rather than leave a truncated .xlsx"""
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()